@@ -21,6 +21,22 @@ def get_kleck():
 
 
 def get_redirect(entry):
+    """获取名称对应的百度百科词条名，没有对应词条时返回 None。
+
+    结果记录在本地地名库中，只有地名库中没有记录时才访问网络。
+    """
+
+    known = gazetteer().redirects
+    if entry in known:
+        return known[entry]
+    if OFFLINE:
+        return None
+    ret = __get_redirect_baike__(entry)
+    gazetteer().add_redirect(entry, ret)
+    return ret
+
+
+def __get_redirect_baike__(entry):
     import sys
 
     # print('REQUEST =', entry, file=sys.stderr)
@@ -47,7 +63,158 @@ def __normalize__(address_norm):
         return None
 
 
+OFFLINE = os.environ.get("OIERDB_OFFLINE", "") not in ("", "0")
+
+
+class Gazetteer:
+    """本地地名库，缓存此前查询得到的地点、经纬度及百科词条，以及行政区中心坐标。
+
+    文件每行格式为：<名称>,<省级行政区>,<地级行政区>,<经度>,<纬度>[,<百科词条>]，未知的字段留空；
+    百科词条为 NO_REDIRECT 表示已查询过但没有对应的词条。
+    """
+
+    NO_REDIRECT = "-"
+
+    def __init__(self, filename):
+        self.filename = filename
+        self.locations = {}
+        self.longlats = {}
+        self.redirects = {}
+        try:
+            with open(filename, encoding="utf-8") as f:
+                for line in f:
+                    line = line.strip()
+                    if not line or line.startswith("#"):
+                        continue
+                    parts = line.split(",")
+                    if len(parts) not in (5, 6):
+                        continue
+                    self.__update__(*parts)
+        except FileNotFoundError:
+            pass
+
+    def __update__(self, name, province, city, lng, lat, redirect=""):
+        if province != "" or city != "":
+            self.locations[name] = (province, city)
+        if lng != "" and lat != "":
+            self.longlats[name] = (float(lng), float(lat))
+        if redirect != "":
+            self.redirects[name] = None if redirect == Gazetteer.NO_REDIRECT else redirect
+
+    def __append__(self, name):
+        province, city = self.locations.get(name, ("", ""))
+        lng, lat = self.longlats.get(name, ("", ""))
+        redirect = self.redirects.get(name, "")
+        if redirect is None:
+            redirect = Gazetteer.NO_REDIRECT
+        with open(self.filename, "a", encoding="utf-8") as f:
+            print(f"{name},{province},{city},{lng},{lat},{redirect}", file=f)
+
+    def get_location(self, entry, province=""):
+        ret = self.locations.get(entry)
+        if ret is not None and ret[0].startswith(province):
+            return ret
+        return None
+
+    def get_longlat(self, location):
+        return self.longlats.get(location)
+
+    def add(self, name, location=None, longlat=None):
+        """记录一次网络查询的结果，并追加到文件。
+
+        name: 名称。
+        location: (省级行政区, 地级行政区)，为 None 时沿用已有记录。
+        longlat: (经度, 纬度)，为 None 时沿用已有记录。
+        """
+
+        province, city = location or self.locations.get(name, ("", ""))
+        lng, lat = longlat or self.longlats.get(name, ("", ""))
+        self.__update__(name, province, city, str(lng), str(lat))
+        self.__append__(name)
+
+    def add_redirect(self, name, redirect):
+        """记录一次百科词条查询的结果，并追加到文件。
+
+        name: 名称。
+        redirect: 词条名，没有对应词条时为 None。
+        """
+
+        self.redirects[name] = redirect
+        self.__append__(name)
+
+
+__gazetteer__ = None
+
+
+def gazetteer():
+    "获取本地地名库。"
+
+    global __gazetteer__
+    if __gazetteer__ is None:
+        __gazetteer__ = Gazetteer(os.environ.get("OIERDB_GAZETTEER", "data/gazetteer.txt"))
+    return __gazetteer__
+
+
+"地点查询与经纬度查询的提供者链，元素为 (提供者, 是否访问网络)，按顺序尝试。"
+__location_providers__ = []
+__longlat_providers__ = []
+
+
+def __register__(chain, provider, network):
+    # 本地提供者排在所有网络提供者之前，只有本地均未命中时才访问网络
+    index = len(chain)
+    if not network:
+        index = next((i for i, (_, is_network) in enumerate(chain) if is_network), index)
+    chain.insert(index, (provider, network))
+
+
+def register_location_provider(provider, network=False):
+    """注册地点查询提供者，排在同类（本地或网络）提供者的最后。
+
+    provider: 函数 (名称, 省份) -> (省级行政区, 地级行政区) 或 None。
+    network: 是否访问网络；离线模式下跳过，查询结果写回本地地名库。
+    """
+
+    __register__(__location_providers__, provider, network)
+
+
+def register_longlat_provider(provider, network=False):
+    """注册经纬度查询提供者，排在同类（本地或网络）提供者的最后。
+
+    provider: 函数 名称 -> (经度, 纬度) 或 None。
+    network: 是否访问网络；离线模式下跳过，查询结果写回本地地名库。
+    """
+
+    __register__(__longlat_providers__, provider, network)
+
+
 def get_location(entry, province=""):
+    "获取地点所在的 (省级行政区, 地级行政区)，依次尝试提供者链，均失败时返回 None。"
+
+    for provider, network in __location_providers__:
+        if network and OFFLINE:
+            continue
+        if (ret := provider(entry, province)) is not None:
+            if network:
+                gazetteer().add(entry, location=ret)
+            return ret
+    return None
+
+
+def get_longlat(location):
+    "获取地点的 (经度, 纬度)，依次尝试提供者链，均失败时返回 (nan, nan)。"
+
+    for provider, network in __longlat_providers__:
+        if network and OFFLINE:
+            continue
+        if (ret := provider(location)) is not None and not math.isnan(ret[0]):
+            if network:
+                gazetteer().add(location, longlat=ret)
+            return ret
+    return math.nan, math.nan
+
+
+def get_location_baidu(entry, province=""):
     try:
         res = requests.get("https://map.baidu.com/?qt=s&wd=" + entry)
         res.encoding = "utf8"
@@ -61,10 +228,6 @@ def get_location(entry, province=""):
         return None
 
 
-def get_longlat(location):
-    return get_longlat_google(location)
-
-
 BAIDU_API_KEY = os.environ.get("BAIDU_MAP_API_KEY")
 
 
@@ -99,3 +262,9 @@ def get_longlat_google(location):
         except Exception:
             print()
             return math.nan, math.nan
+
+
+register_location_provider(lambda entry, province: gazetteer().get_location(entry, province))
+register_location_provider(get_location_baidu, network=True)
+register_longlat_provider(lambda location: gazetteer().get_longlat(location))
+register_longlat_provider(get_longlat_google, network=True)
@@ -1,10 +1,35 @@
-from fastapi import FastAPI, HTTPException
+from bitmap import Bitmap, BitmapIndex
+from cache import ResponseCache
+from collections import Counter
+from concurrent.futures import Future
+from fastapi import FastAPI, Header, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import FileResponse
-from pydantic import BaseModel
-from typing import List, Dict, Any
+from fastapi.responses import JSONResponse, Response, StreamingResponse
+from fuzzy import FuzzyNameIndex
+from pydantic import BaseModel, TypeAdapter
+from sys import stderr
+from trie import PrefixTrie
+from typing import List, Dict, Any, Optional, Union
+import anyio
+import anyio.to_thread
+import asyncio
+import base64
+import bisect
+import functools
+import gzip
+import hashlib
+import hmac
+import itertools
 import json
+import math
 import os
+import threading
+import time
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
 
 app = FastAPI(title="OIerDb Query API", description="批量查询选手获奖信息API")
 
@@ -15,20 +40,40 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],
 )
 
 class QueryRequest(BaseModel):
     names: List[str]  # 选手姓名列表
+    fuzzy: bool = False  # 姓名没有精确匹配时是否查找相近的姓名
 
 class SearchRequest(BaseModel):
     query: str  # 搜索关键词
     search_type: str = "name"  # 搜索类型：name, school, contest, province
     limit: int = 50  # 返回结果数量限制
+    cursor: Optional[str] = None  # 上一页返回的 next_cursor
+    facets: List[str] = []  # 需要统计分布的字段：year, contest_type, level, province, enroll_middle, ccf_level, gender
+    facet_limit: int = 20  # 每个字段最多返回的取值数
 
 class RankingRequest(BaseModel):
     score_type: str = "oierdb"  # 评分类型：oierdb, ccf
     limit: int = 100  # 返回结果数量
     offset: int = 0  # 分页偏移量
+    cursor: Optional[str] = None  # 上一页响应头中的 X-Next-Cursor，指定时忽略 offset
+
+class AdvancedQueryRequest(BaseModel):
+    province: Optional[str] = None  # 获奖时所在省份
+    school: Optional[str] = None  # 获奖时所在学校全称
+    school_id: Optional[int] = None  # 获奖时所在学校的 ID
+    contest_type: Optional[str] = None  # 比赛类型，如 NOI、NOIP提高
+    year_min: Optional[int] = None  # 比赛年份下限（含）
+    year_max: Optional[int] = None  # 比赛年份上限（含）
+    level: Optional[str] = None  # 奖项，如 金牌、一等奖
+    min_ccf_level: Optional[int] = None  # CCF 等级下限（含）
+    enroll_middle: Optional[int] = None  # 初中入学年份
+    gender: Optional[str] = None  # 性别：男, 女, 未知
+    limit: int = 50  # 返回结果数量限制
+    cursor: Optional[str] = None  # 上一页返回的 next_cursor
 
 class AwardInfo(BaseModel):
     name: str
@@ -39,24 +84,228 @@ class AwardInfo(BaseModel):
     ccf_level: int
     records: List[Dict[str, Any]]
 
+class MatchedAwardInfo(AwardInfo):
+    query: str  # 查询的姓名
+    distance: int  # 与查询姓名的距离，0 为精确匹配
+
 class SearchResult(BaseModel):
     total: int
     results: List[AwardInfo]
+    next_cursor: Optional[str] = None
+    facets: Optional[Dict[str, Dict[str, int]]] = None
 
 class ContestInfo(BaseModel):
+    id: int
     name: str
     type: str
     year: int
     contestants_count: int
 
+class ContestResultInfo(BaseModel):
+    rank: int
+    uid: int
+    name: str
+    score: Optional[float]
+    level: str
+    province: str
+    school: Optional[str]
+
+class LevelCutoff(BaseModel):
+    level: str
+    count: int  # 获得该奖项的人数
+    rank: int  # 该奖项最后一名的排名
+    score: Optional[float]  # 该奖项最后一名的分数
+
+class ContestResults(BaseModel):
+    id: int
+    name: str
+    type: str
+    year: int
+    total: int
+    cutoffs: List[LevelCutoff]
+    results: List[ContestResultInfo]
+
 class SchoolInfo(BaseModel):
     name: str
     province: str
     city: str
     student_count: int
 
-# 全局变量存储数据
-data_loaded = False
+class SchoolRankingInfo(BaseModel):
+    rank: int
+    id: int
+    name: str
+    province: str
+    city: str
+    score: float
+
+class SchoolRankingResult(BaseModel):
+    total: int
+    results: List[SchoolRankingInfo]
+
+class SuggestionInfo(BaseModel):
+    id: int  # 选手 uid、学校 ID 或比赛 ID
+    name: str
+    detail: Optional[str] = None  # 选手最近获奖时的学校，或学校所在省份城市
+
+class SuggestResult(BaseModel):
+    oiers: List[SuggestionInfo] = []
+    schools: List[SuggestionInfo] = []
+    contests: List[SuggestionInfo] = []
+
+# 数据加载状态：同一时间至多进行一次加载，并发请求共享同一个 Future
+__load_lock__ = threading.Lock()
+__load_future__ = None
+
+# 当前对外提供服务的数据快照，热更新时整体替换
+__snapshot__ = None
+
+# 数据尚未就绪时请求最多等待的秒数，超时返回 503
+LOAD_WAIT = float(os.environ.get("OIERDB_LOAD_WAIT", "0"))
+
+# 检查数据文件是否更新的间隔秒数，为 0 时不检查
+WATCH_INTERVAL = float(os.environ.get("OIERDB_WATCH_INTERVAL", "0"))
+
+# 重新加载后选手数减少的比例超过该值时拒绝替换快照，除非强制重新加载
+MAX_SHRINK = float(os.environ.get("OIERDB_MAX_SHRINK", "0.1"))
+
+# 调用管理接口所需的令牌，为空时管理接口不可用
+ADMIN_TOKEN = os.environ.get("OIERDB_ADMIN_TOKEN", "")
+
+# 工作线程数与最多排队的请求数，排队已满时返回 503
+WORKERS = int(os.environ.get("OIERDB_WORKERS", "4"))
+QUEUE_LIMIT = int(os.environ.get("OIERDB_QUEUE_LIMIT", "64"))
+
+# /query 与 /search 响应缓存的容量（字节）与存活秒数
+CACHE_BYTES = int(os.environ.get("OIERDB_CACHE_BYTES", str(64 << 20)))
+CACHE_TTL = float(os.environ.get("OIERDB_CACHE_TTL", "300"))
+
+# 可缓存响应的 Cache-Control max-age 秒数
+CACHE_MAX_AGE = int(os.environ.get("OIERDB_CACHE_MAX_AGE", "60"))
+
+RESULT_FILE = "dist/result.txt"
+
+# /suggest 每类最多返回的补全数，即前缀树每个节点保存的对象数
+SUGGEST_LIMIT = 10
+
+# 数据版本由这些文件的内容决定
+SOURCE_FILES = ["static/contests.json", "data/school.txt", RESULT_FILE]
+
+response_cache = ResponseCache(CACHE_BYTES, CACHE_TTL)
+
+class Snapshot:
+    """一次完整加载得到的只读数据快照
+
+    请求在开始时取得当前快照，之后只通过它访问数据；热更新时在后台构建新快照并整体替换，
+    进行中的请求仍在旧快照上完成。快照中的对象在发布后不再修改。
+    """
+
+    # 支持的选手排行评分类型及其排序键，并列时按 uid 升序
+    OIER_RANKINGS = {
+        "oierdb": lambda oier: (-oier.oierdb_score, oier.uid),
+        "ccf": lambda oier: (-oier.ccf_score, oier.uid),
+    }
+
+    def __init__(self, oiers, contests, schools, school_ranking, source_mtime, version):
+        self.oiers = oiers
+        self.oiers_by_uid = {oier.uid: oier for oier in oiers}
+        # 每个姓名对应的选手在 oiers 中的下标，按 DB 评分排序
+        self.oiers_by_name = {}
+        for position, oier in enumerate(oiers):
+            self.oiers_by_name.setdefault(oier.name, []).append(position)
+        self.fuzzy_names = FuzzyNameIndex()
+        for name, positions in self.oiers_by_name.items():
+            self.fuzzy_names.add(name, oiers[positions[0]].initials)
+        self.contests = contests
+        self.schools = schools
+        self.__school_ranking__ = school_ranking
+        self.source_mtime = source_mtime
+        self.version = version
+        self.loaded_at = time.time()
+
+        # 已编码并预压缩的聚合响应，按路径缓存，随快照一同替换
+        self.bodies = {}
+
+        # oiers 已由 OIer.sort_by_score 按 DB 评分排序
+        self.__oier_rankings__ = {
+            "oierdb": oiers,
+            "ccf": sorted(oiers, key=Snapshot.OIER_RANKINGS["ccf"]),
+        }
+
+        self.index = Snapshot.__build_index__(oiers)
+        self.suggestions = Snapshot.__build_suggestions__(oiers, contests, schools)
+
+        # 每个学校（按名称）有记录的不同姓名数
+        students = {}
+        for oier in oiers:
+            for record in oier.records:
+                if record.school:
+                    students.setdefault(record.school.name, set()).add(oier.name)
+        self.school_student_counts = {name: len(names) for name, names in students.items()}
+
+    @staticmethod
+    def __build_index__(oiers):
+        """以选手在 oiers 中的下标（即 DB 评分排名）建立位图索引
+
+        选手字段：gender, enroll_middle, ccf_level；
+        记录字段（任一记录满足即可）：province, school（名称）, school_id, contest_type, year, level。
+        """
+        index = BitmapIndex(len(oiers))
+        for position, oier in enumerate(oiers):
+            index.add("gender", oier.gender, position)
+            index.add("enroll_middle", oier.enroll_middle, position)
+            index.add("ccf_level", oier.ccf_level, position)
+            for record in oier.records:
+                index.add("province", record.province, position)
+                if record.school is not None:
+                    index.add("school", record.school.name, position)
+                    index.add("school_id", record.school.id, position)
+                index.add("contest_type", record.contest.type, position)
+                index.add("year", record.contest.year, position)
+                index.add("level", record.level, position)
+        index.freeze()
+        return index
+
+    @staticmethod
+    def __build_suggestions__(oiers, contests, schools):
+        """为 /suggest 建立各类对象的前缀树，键均转为小写
+
+        选手：姓名、拼音首字母，按 DB 评分降序；学校：名称、别名，按学校评分降序；比赛：名称，按年份降序。
+        """
+        suggestions = {field: PrefixTrie(SUGGEST_LIMIT) for field in ("oiers", "schools", "contests")}
+        for oier in oiers:
+            latest = max(oier.records, key=lambda record: (record.contest.year, record.contest.id), default=None)
+            detail = latest.school.name if latest is not None and latest.school is not None else None
+            item = SuggestionInfo(id=oier.uid, name=oier.name, detail=detail)
+            suggestions["oiers"].insert(oier.name.lower(), item)
+            suggestions["oiers"].insert(oier.initials.lower(), item)
+        for school in sorted(schools, key=lambda school: (-school.score, school.id)):
+            item = SuggestionInfo(id=school.id, name=school.name, detail=f"{school.province} {school.city}")
+            for name in [school.name] + school.aliases:
+                suggestions["schools"].insert(name.lower(), item)
+        for contest in sorted(contests, key=lambda contest: (-contest.year, contest.id)):
+            suggestions["contests"].insert(contest.name.lower(), SuggestionInfo(id=contest.id, name=contest.name))
+        return suggestions
+
+    def oier_ranking(self, score_type):
+        """获取按指定评分降序排列的选手列表
+
+        score_type: 评分类型，取值见 Snapshot.OIER_RANKINGS。
+        """
+        return self.__oier_rankings__[score_type]
+
+    def seek(self, oiers, score_type, position):
+        """在按 score_type 排序的选手列表中定位游标，返回排在 position 之后的第一个下标
+
+        oiers: oier_ranking(score_type) 或其保持顺序的子序列。
+        position: 排序键，见 Snapshot.OIER_RANKINGS。
+        """
+        return bisect.bisect_right(oiers, position, key=Snapshot.OIER_RANKINGS[score_type])
+
+    def school_ranking(self, province=None, city=None):
+        """获取按评分降序排列的学校列表，参数含义同 School.ranking"""
+        from school import School
+        return self.__school_ranking__.get(School.ranking_key(province, city), [])
 
 def load_contests():
     """加载比赛数据"""
@@ -69,17 +318,7 @@ def load_contests():
 def load_schools():
     """加载学校数据"""
     from school import School
-    with open("data/school.txt", "r", encoding="utf-8") as f:
-        for line in f:
-            line = line.strip()
-            if not line or line.startswith("#"):
-                continue
-            parts = line.split(",")
-            if len(parts) < 3:
-                continue
-            province, city, name = parts[0], parts[1], parts[2]
-            aliases = parts[3:] if len(parts) > 3 else []
-            School.create(name, province, city, aliases)
+    return School.load("data/school.txt")
 
 def parse_compressed_record(record_str, oier):
     """解析压缩格式的记录"""
@@ -92,40 +331,41 @@ def parse_compressed_record(record_str, oier):
     if len(parts) < 6:
         return None
 
-    # 压缩格式含义：contest_id:school_id:score:rank:province_idx:award_level_idx
+    # 压缩格式含义：contest_id:school_id:score:rank:province_idx:award_level_idx[:em 或 ;em]
     contest_id = int(parts[0])
     school_id = int(parts[1])
     score = None if parts[2] == "" else float(parts[2])
     rank = int(parts[3]) if parts[3] != "" else 0
     province_field = parts[4]
-    level_field = parts[5]
+    level_field = parts[5].split(";", 1)[0]
 
-    # 恢复 contest 对象
-    contest = next((c for c in Contest.__all_contests_list__ if c.id == contest_id), None)
-
-    # 恢复 school 对象
-    school = next((s for s in School.__all_school_list__ if s.id == school_id), None)
+    # 比赛与学校的 ID 即为其在列表中的下标
+    contests = Contest.__all_contests_list__
+    contest = contests[contest_id] if contest_id < len(contests) else None
+    schools = School.get_all()
+    school = schools[school_id] if school_id < len(schools) else None
 
-    # province_field 可能是索引或原始名称，尝试转换
-    try:
-        province = util.provinces[int(province_field)] if province_field.isnumeric() else province_field
-    except Exception:
-        province = province_field
+    # 编号与字符串表的标准编号一致，可直接存入记录；也可能是原始名称
+    if province_field.isdecimal() and util.province_table.is_standard(int(province_field)):
+        province_code = int(province_field)
+    else:
+        province_code = util.province_table.code(province_field)
 
-    # level_field 可能是索引或名称
-    try:
-        level = util.award_levels[int(level_field)] if level_field.isnumeric() else level_field
-    except Exception:
-        level = level_field
+    if level_field.isdecimal() and util.award_level_table.is_standard(int(level_field)):
+        level_code = int(level_field)
+    else:
+        level_code = util.award_level_table.code(level_field)
 
     if contest:
-        record = Record(oier, contest, score, rank, level, "", school, province, oier.gender)
+        record = Record(oier, contest, score, rank, level_code, 0, school, province_code, oier.gender)
         oier.add_record(record)
+        contest.contestants.append(record)
+        contest.level_counts[record.level] += 1
 
 def load_oiers():
     """加载选手数据"""
     from oier import OIer
-    with open("dist/result.txt", "r", encoding="utf-8") as f:
+    with open(RESULT_FILE, "r", encoding="utf-8") as f:
         for line in f:
             line = line.strip()
             if not line:
@@ -137,14 +377,15 @@ def load_oiers():
             uid = int(parts[0])
             initials = parts[1]
             name = parts[2]
-            gender = "男" if parts[3] == "1" else "女"
+            gender = int(parts[3])  # 1 为男，-1 为女，0 为未知
             enroll_middle = int(parts[4])
             oierdb_score = float(parts[5])
             ccf_score = float(parts[6])
             ccf_level = int(parts[7])
             records_str = parts[8]
             
-            oier = OIer.of(name, f"{name}({initials})", gender, enroll_middle, uid)
+            # 每行对应一名选手，同名同缩写的选手也不能合并
+            oier = OIer(name, f"{name}<{initials}>", gender, enroll_middle, uid)
             oier.oierdb_score = oierdb_score
             oier.ccf_score = ccf_score
             oier.ccf_level = ccf_level
@@ -154,26 +395,405 @@ def load_oiers():
                 for record_str in records_str.split("/"):
                     parse_compressed_record(record_str, oier)
 
-def load_data():
-    global data_loaded
-    if not data_loaded:
-        load_contests()
-        load_schools()
-        load_oiers()
-        from oier import OIer
-        OIer.sort_by_score()
-        data_loaded = True
+def dataset_version():
+    """根据数据文件内容计算数据版本号"""
+    digest = hashlib.blake2b(digest_size=8)
+    for filename in SOURCE_FILES:
+        with open(filename, "rb") as f:
+            while chunk := f.read(1 << 20):
+                digest.update(chunk)
+    return digest.hexdigest()
+
+def build_snapshot():
+    """从头加载全部数据并构建新快照
+
+    加载过程会重建 Contest、School、OIer 的全局容器；已发布的快照持有旧容器及其中对象的引用，不受影响。
+    """
+    from contest import Contest
+    from oier import OIer
+    from school import School
+
+    # 先记录修改时间，加载期间文件再次更新时能被下一次检查发现
+    source_mtime = os.stat(RESULT_FILE).st_mtime_ns
+    version = dataset_version()
+    Contest.clear()
+    School.clear()
+    OIer.clear()
+    load_contests()
+    School.print_conflict_report(load_schools())
+    load_oiers()
+    OIer.sort_by_score()
+    # 记录按选手顺序加入比赛，需重新按排名排序
+    for contest in Contest.__all_contests_list__:
+        contest.sort_contestants()
+    school_ranking = School.build_ranking(OIer.get_all())
+    return Snapshot(OIer.get_all(), Contest.__all_contests_list__, School.get_all(), school_ranking, source_mtime, version)
+
+def run_loading(future, force):
+    global __snapshot__
+    try:
+        snapshot = build_snapshot()
+        current = __snapshot__
+        # 数据文件被截断时加载不会出错（残缺的行被跳过），只能通过选手数骤减发现
+        if not force and current is not None and len(snapshot.oiers) < len(current.oiers) * (1 - MAX_SHRINK):
+            raise RuntimeError(
+                f"选手数从 {len(current.oiers)} 降至 {len(snapshot.oiers)}，数据文件可能不完整，已拒绝替换；"
+                "确认无误后请强制重新加载"
+            )
+    except BaseException as e:
+        print(f"数据加载失败: {e}", file=stderr)
+        future.set_exception(e)
+    else:
+        __snapshot__ = snapshot  # 替换引用是原子操作，新请求从此使用新快照
+        response_cache.clear()
+        future.set_result(snapshot)
+
+def start_loading(reload=False, force=False):
+    """在后台线程中开始加载数据，返回代表该次加载的 Future
+
+    正在加载时返回同一个 Future；上一次加载已结束时，仅在 reload 为真或上一次加载失败时重新开始。
+    force 为真时即使选手数骤减也替换快照。
+    """
+    global __load_future__
+    with __load_lock__:
+        future = __load_future__
+        if future is None or (future.done() and (reload or future.exception() is not None)):
+            future = __load_future__ = Future()
+            threading.Thread(target=run_loading, args=(future, force), name="oierdb-loader", daemon=True).start()
+        return future
+
+def load_state():
+    """获取数据加载状态：idle, loading, ready, failed
+
+    已有快照时始终为 ready，热更新进行中或失败不影响对外服务。
+    """
+    if __snapshot__ is not None:
+        return "ready"
+    future = __load_future__
+    if future is None:
+        return "idle"
+    if not future.done():
+        return "loading"
+    return "failed" if future.exception() is not None else "ready"
+
+async def require_data():
+    """获取当前快照：首次加载中的请求最多等待 LOAD_WAIT 秒，之后返回 503"""
+    snapshot = __snapshot__
+    if snapshot is not None:
+        return snapshot
+    future = start_loading()
+    if not future.done():
+        try:
+            await asyncio.wait_for(asyncio.shield(asyncio.wrap_future(future)), LOAD_WAIT)
+        except asyncio.TimeoutError:
+            raise HTTPException(status_code=503, detail="数据加载中，请稍后重试", headers={"Retry-After": "5"})
+        except Exception:
+            pass  # 加载失败，统一在下面处理
+    if future.exception() is not None:
+        raise HTTPException(status_code=500, detail=f"数据加载失败: {str(future.exception())}")
+    return future.result()
+
+def watch_source():
+    """定期检查数据文件的修改时间，发生变化时在后台重新加载
+
+    文件可能正被原地改写，只有修改时间与大小在连续两次检查中保持不变时才重新加载。
+    加载失败或被拒绝时记下此时的修改时间与大小，文件再次变化前不再重试。
+    """
+    pending = failed = None
+    while True:
+        time.sleep(WATCH_INTERVAL)
+        snapshot = __snapshot__
+        try:
+            stat = os.stat(RESULT_FILE)
+        except OSError:
+            pending = None
+            continue  # 文件正在被替换
+        state = (stat.st_mtime_ns, stat.st_size)
+        if snapshot is None or stat.st_mtime_ns == snapshot.source_mtime or state == failed:
+            pending = None
+        elif state != pending:
+            pending = state  # 等待下一次检查确认文件已写完
+        else:
+            pending = None
+            if start_loading(reload=True).exception() is not None:  # 阻塞至加载结束
+                failed = state
+
+# 计算密集型请求的并发限制，在事件循环中首次使用时创建
+__limiter__ = None
+__pending__ = 0
+
+# 流式输出时每次在工作线程中编码的对象数
+STREAM_BATCH = 256
+
+def get_limiter():
+    global __limiter__
+    if __limiter__ is None:
+        __limiter__ = anyio.CapacityLimiter(WORKERS)
+    return __limiter__
+
+async def run_in_pool(func, *args):
+    """在有界线程池中执行计算密集型的同步函数，避免阻塞事件循环
+
+    最多 WORKERS 个请求同时执行，其余排队；排队请求数超过 QUEUE_LIMIT 时直接返回 503。
+    计数只在事件循环线程中修改，无需加锁。
+    """
+    global __pending__
+    if __pending__ >= WORKERS + QUEUE_LIMIT:
+        raise HTTPException(status_code=503, detail="服务繁忙，请稍后重试", headers={"Retry-After": "1"})
+    __pending__ += 1
+    try:
+        return await anyio.to_thread.run_sync(func, *args, limiter=get_limiter())
+    finally:
+        __pending__ -= 1
+
+@functools.lru_cache(maxsize=None)
+def type_adapter(model):
+    return TypeAdapter(model)
+
+def render(content, model):
+    """按响应模型将结果编码为 JSON 响应
+
+    在工作线程中调用，使 pydantic 模型的序列化也不占用事件循环。
+    """
+    return Response(type_adapter(model).dump_json(content), media_type="application/json")
+
+def wants_stream(request, stream):
+    """判断客户端是否请求 NDJSON 流式输出：stream=true 或 Accept 头包含 application/x-ndjson"""
+    return stream or "application/x-ndjson" in request.headers.get("accept", "")
+
+def stream_response(items, convert, model):
+    """以 NDJSON 格式流式输出，每行一个对象
+
+    items: 可迭代对象，通常是快照中预先排好序的列表，不会被复制。
+    convert: 将 items 中的元素转换为 model 实例的函数。
+
+    每批 STREAM_BATCH 个对象在工作线程中转换并编码后立即发送，内存占用与结果总数无关。
+    已开始的流不受排队上限限制，避免输出到一半被中断。
+    """
+    adapter = type_adapter(model)
+    iterator = iter(items)
+
+    def next_chunk():
+        return b"".join(adapter.dump_json(convert(item)) + b"\n" for item in itertools.islice(iterator, STREAM_BATCH))
+
+    async def chunks():
+        while chunk := await anyio.to_thread.run_sync(next_chunk, limiter=get_limiter()):
+            yield chunk
+
+    return StreamingResponse(chunks(), media_type="application/x-ndjson")
+
+def encode_cursor(score_type, oier):
+    """生成指向 oier 之后位置的游标，内容为排序键，与快照中的下标无关"""
+    key = Snapshot.OIER_RANKINGS[score_type](oier)
+    payload = json.dumps([score_type, -key[0], key[1]], separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(payload).rstrip(b"=").decode()
+
+def decode_cursor(cursor, score_type):
+    """解析游标，返回排序键；游标无效或评分类型不符时返回 400"""
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        kind, score, uid = payload
+        if kind == score_type and isinstance(score, (int, float)) and isinstance(uid, int):
+            return (-score, uid)
+    except (ValueError, TypeError):
+        pass
+    raise HTTPException(status_code=400, detail="无效的 cursor")
+
+def to_award_info(oier, model=AwardInfo, **fields):
+    records_out = []
+    for rec in oier.records:
+        records_out.append({
+            "contest_name": rec.contest.name,
+            "contest_type": rec.contest.type,
+            "year": rec.contest.year,
+            "score": rec.score,
+            "rank": rec.rank,
+            "level": rec.level,
+            "province": rec.province,
+            "school": rec.school.name if rec.school else None,
+        })
+    return model(
+        name=oier.name,
+        gender="男" if oier.gender == 1 else ("女" if oier.gender == -1 else ""),
+        enroll_middle=oier.enroll_middle if oier.enroll_middle else 0,
+        oierdb_score=float(oier.oierdb_score) if hasattr(oier, "oierdb_score") else 0.0,
+        ccf_score=float(oier.ccf_score) if hasattr(oier, "ccf_score") else 0.0,
+        ccf_level=int(oier.ccf_level) if hasattr(oier, "ccf_level") else 0,
+        records=records_out,
+        **fields,
+    )
+
+class CachedBody:
+    """编码完成的响应体及其预压缩版本"""
+
+    def __init__(self, body, media_type="application/json"):
+        self.media_type = media_type
+        self.encodings = {"identity": body, "gzip": gzip.compress(body, 6)}
+        if brotli is not None:
+            self.encodings["br"] = brotli.compress(body)
+
+    @staticmethod
+    def of(func, *args):
+        """调用返回 Response 的 func，缓存其响应体"""
+        response = func(*args)
+        return CachedBody(response.body, response.media_type)
+
+    def response(self, request):
+        """按 Accept-Encoding 选择最小的可接受版本"""
+        accepted = accepted_encodings(request)
+        encoding = min(
+            (encoding for encoding in self.encodings if encoding in accepted),
+            key=lambda encoding: len(self.encodings[encoding]),
+        )
+        headers = {} if encoding == "identity" else {"Content-Encoding": encoding}
+        return Response(self.encodings[encoding], media_type=self.media_type, headers=headers)
+
+def accepted_encodings(request):
+    """解析 Accept-Encoding 头，返回客户端接受的编码集合（q=0 的编码除外）"""
+    accepted = {"identity"}
+    for item in request.headers.get("accept-encoding", "").split(","):
+        encoding, _, params = item.strip().partition(";")
+        q = params.strip()
+        if q.startswith("q="):
+            try:
+                if float(q[2:]) == 0:
+                    accepted.discard(encoding.strip())
+                    continue
+            except ValueError:
+                continue
+        accepted.add(encoding.strip())
+    return accepted
+
+async def cached_response(request, snapshot, key, func, *args):
+    """返回缓存在当前快照上的响应，首次请求时在工作线程中生成并预压缩"""
+    body = snapshot.bodies.get(key)
+    if body is None:
+        body = snapshot.bodies[key] = await run_in_pool(CachedBody.of, func, *args)
+    return body.response(request)
+
+async def cached_query(snapshot, key, func, *args):
+    """从响应缓存获取结果，未命中时在工作线程中调用 func(snapshot, *args) 计算
+
+    key: 影响结果的请求参数，会附加数据版本号。
+    """
+
+    async def compute():
+        response = await run_in_pool(func, snapshot, *args)
+        return response.body, response.media_type
+
+    body, media_type = await response_cache.get_or_compute((snapshot.version,) + key, compute)
+    return Response(body, media_type=media_type)
+
+# 使用 HTTP 缓存的 GET 端点（及路径前缀），其内容只取决于数据版本与请求参数
+CACHEABLE_PATHS = {"/", "/contests", "/schools", "/schools/ranking", "/stats", "/ranking", "/suggest"}
+CACHEABLE_PREFIXES = ("/contests/", "/schools/")
+
+# 首页内容的 (修改时间, 版本号, 响应体)
+__index__ = None
+
+def index_page():
+    global __index__
+    mtime = os.stat("index.html").st_mtime_ns
+    if __index__ is None or __index__[0] != mtime:
+        with open("index.html", "rb") as f:
+            body = f.read()
+        __index__ = (mtime, hashlib.blake2b(body, digest_size=8).hexdigest(), CachedBody(body, "text/html"))
+    return __index__
+
+def make_etag(version, request):
+    """生成强 ETag：由数据版本与影响响应内容的请求参数决定"""
+    variant = "ndjson" if wants_stream(request, False) else "json"
+    key = f"{request.url.path}?{request.url.query}#{variant}".encode()
+    return f'"{version}-{hashlib.blake2b(key, digest_size=6).hexdigest()}"'
+
+def etag_matches(request, etag):
+    """按弱比较判断 If-None-Match 是否命中，忽略编码后缀与 W/ 前缀"""
+    header = request.headers.get("if-none-match")
+    if header is None:
+        return False
+    for tag in header.split(","):
+        tag = tag.strip().removeprefix("W/")
+        if tag == "*" or tag == etag or tag.rsplit("-", 1)[0] + '"' == etag:
+            return True
+    return False
+
+@app.middleware("http")
+async def http_cache(request: Request, call_next):
+    """为只读端点添加 ETag 与 Cache-Control，并处理 304 Not Modified"""
+    path = request.url.path
+    if request.method not in ("GET", "HEAD") or not (path in CACHEABLE_PATHS or path.startswith(CACHEABLE_PREFIXES)):
+        return await call_next(request)
+    if request.url.path == "/":
+        version = index_page()[1]
+    elif __snapshot__ is not None:
+        version = __snapshot__.version
+    else:
+        return await call_next(request)
+
+    etag = make_etag(version, request)
+    headers = {"ETag": etag, "Cache-Control": f"public, max-age={CACHE_MAX_AGE}", "Vary": "Accept, Accept-Encoding"}
+    if etag_matches(request, etag):
+        return Response(status_code=304, headers=headers)
+    response = await call_next(request)
+    if response.status_code == 200:
+        encoding = response.headers.get("content-encoding")
+        if encoding is not None:
+            # 不同编码的表示须使用不同的强 ETag
+            headers["ETag"] = etag[:-1] + "-" + encoding + '"'
+        response.headers.update(headers)
+    return response
 
 @app.on_event("startup")
 async def startup_event():
-    # 启动时加载数据，确保查询可用
-    load_data()
+    # 启动时在后台开始加载数据，加载期间 /health/ready 返回 503
+    start_loading()
+    if WATCH_INTERVAL > 0:
+        threading.Thread(target=watch_source, name="oierdb-watcher", daemon=True).start()
+
+@app.get("/health/ready")
+async def health_ready():
+    """就绪检查API - 数据加载完成前返回 503，供负载均衡器使用"""
+    state = load_state()
+    future = __load_future__
+    content = {"status": state, "reloading": state == "ready" and future is not None and not future.done()}
+    if __snapshot__ is not None:
+        content["loaded_at"] = __snapshot__.loaded_at
+    if future is not None and future.done() and future.exception() is not None:
+        content["detail"] = str(future.exception())
+    return JSONResponse(content, status_code=200 if state == "ready" else 503)
+
+def check_admin_token(token):
+    """校验管理令牌；未配置 OIERDB_ADMIN_TOKEN 时管理接口一律拒绝访问"""
+    if not ADMIN_TOKEN:
+        raise HTTPException(status_code=403, detail="未配置管理令牌，管理接口已禁用")
+    if token is None or not hmac.compare_digest(token.encode(), ADMIN_TOKEN.encode()):
+        raise HTTPException(status_code=403, detail="管理令牌无效")
+
+@app.post("/admin/reload", status_code=202)
+async def admin_reload(wait: bool = False, force: bool = False, x_admin_token: Optional[str] = Header(None)):
+    """热更新API - 在后台重新加载数据，完成后原子地替换当前快照，期间照常提供服务"""
+    check_admin_token(x_admin_token)
+
+    future = start_loading(reload=True, force=force)
+    if not wait:
+        return {"status": "reloading"}
+    try:
+        snapshot = await asyncio.wrap_future(future)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"数据加载失败: {str(e)}")
+    return JSONResponse({"status": "ready", "loaded_at": snapshot.loaded_at, "total_oiers": len(snapshot.oiers)})
+
+@app.get("/admin/cache")
+async def admin_cache(x_admin_token: Optional[str] = Header(None)):
+    """响应缓存统计API - 命中率、容量与淘汰次数"""
+    check_admin_token(x_admin_token)
+    return response_cache.stats()
 
 @app.get("/")
-async def root():
-    return FileResponse("index.html")
+async def root(raw_request: Request):
+    return index_page()[2].response(raw_request)
 
-@app.post("/query", response_model=List[AwardInfo])
+@app.post("/query", response_model=Union[List[AwardInfo], List[MatchedAwardInfo]])
 async def query_awards(request: QueryRequest):
     """批量查询选手信息API"""
     # 输入验证
@@ -184,254 +804,461 @@ async def query_awards(request: QueryRequest):
         raise HTTPException(status_code=400, detail="单次查询名单不能超过100个")
     
     # 确保数据已加载
-    try:
-        load_data()
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"数据加载失败: {str(e)}")
-
-    from oier import OIer
+    snapshot = await require_data()
+    # 姓名按原样精确匹配，结果按名单顺序排列且重复的姓名会重复返回，因此名单原样作为缓存键
+    return await cached_query(snapshot, ("query", tuple(request.names), request.fuzzy), query_awards_sync, request)
 
+def query_awards_sync(snapshot, request):
+    """/query 的计算部分，在工作线程中执行"""
+    if request.fuzzy:
+        return fuzzy_query_sync(snapshot, request)
     results = []
     # 对每个请求中的姓名，进行精确匹配（考虑多个同名情况）
     for name in request.names:
-        for oier in OIer.get_all():
-            if oier.name == name:
-                records_out = []
-                for rec in oier.records:
-                    records_out.append({
-                        "contest_name": rec.contest.name,
-                        "contest_type": rec.contest.type,
-                        "year": rec.contest.year,
-                        "score": rec.score,
-                        "rank": rec.rank,
-                        "level": rec.level,
-                        "province": rec.province,
-                        "school": rec.school.name if rec.school else None,
-                    })
-                results.append(
-                    AwardInfo(
-                        name=oier.name,
-                        gender="男" if oier.gender == 1 else ("女" if oier.gender == -1 else ""),
-                        enroll_middle=oier.enroll_middle if oier.enroll_middle else 0,
-                        oierdb_score=float(oier.oierdb_score) if hasattr(oier, "oierdb_score") else 0.0,
-                        ccf_score=float(oier.ccf_score) if hasattr(oier, "ccf_score") else 0.0,
-                        ccf_level=int(oier.ccf_level) if hasattr(oier, "ccf_level") else 0,
-                        records=records_out,
-                    )
-                )
-
-    return results
+        for position in snapshot.oiers_by_name.get(name, []):
+            results.append(to_award_info(snapshot.oiers[position]))
+
+    return render(results, List[AwardInfo])
+
+# 模糊查询时每个姓名最多返回的相近选手数
+FUZZY_LIMIT = 10
+
+def fuzzy_query_sync(snapshot, request):
+    """模糊查询：有精确匹配时返回全部同名选手，否则返回相近姓名的选手
+
+    相近的选手按拼音首字母是否相同（同音字优先）、距离、DB 评分排序，每个姓名至多返回 FUZZY_LIMIT 个。
+    """
+    import util
+
+    results = []
+    for name in request.names:
+        if name in snapshot.oiers_by_name:
+            matches = [(0, position) for position in snapshot.oiers_by_name[name]]
+        else:
+            candidates = snapshot.fuzzy_names.lookup(name, util.get_initials(name))
+            matches = sorted(
+                (not same_initials, distance, position)
+                for candidate, (distance, same_initials) in candidates.items()
+                for position in snapshot.oiers_by_name[candidate]
+            )
+            matches = [(distance, position) for _, distance, position in matches[:FUZZY_LIMIT]]
+        for distance, position in matches:
+            results.append(to_award_info(snapshot.oiers[position], MatchedAwardInfo, query=name, distance=distance))
+
+    return render(results, List[MatchedAwardInfo])
 
 @app.post("/search", response_model=SearchResult)
 async def search_oiers(request: SearchRequest):
-    """智能搜索API - 支持按姓名、学校、比赛、省份搜索"""
-    load_data()
-    
-    from oier import OIer
-    from school import School
-    from contest import Contest
-    
-    results = []
-    query = request.query.lower().strip()
-    
-    if request.search_type == "name":
-        # 按姓名搜索（支持模糊匹配）
-        for oier in OIer.get_all():
-            if query in oier.name.lower():
-                results.append(oier)
-                if len(results) >= request.limit:
-                    break
-    
-    elif request.search_type == "school":
+    """智能搜索API - 支持按姓名、学校、比赛、省份搜索，结果按 DB 评分排序，可用游标翻页"""
+    if request.limit < 0:
+        raise HTTPException(status_code=400, detail="limit不能为负数")
+    for field in request.facets:
+        if field not in FACET_FIELDS:
+            raise HTTPException(status_code=400, detail=f"不支持的 facet 字段: {field}")
+    if not 0 <= request.facet_limit <= MAX_FACET_LIMIT:
+        raise HTTPException(status_code=400, detail=f"facet_limit须在0到{MAX_FACET_LIMIT}之间")
+    position = None if request.cursor is None else decode_cursor(request.cursor, "oierdb")
+
+    snapshot = await require_data()
+    # 与 search_oiers_sync 中的处理一致，只区分影响结果的参数
+    facets = tuple(dict.fromkeys(request.facets))
+    key = ("search", request.search_type, request.query.lower().strip(), request.limit, position, facets, request.facet_limit)
+    return await cached_query(snapshot, key, search_oiers_sync, request, position)
+
+# 性别名称与 OIer.gender 取值的对应
+GENDER_CODES = {"男": 1, "女": -1, "未知": 0}
+
+# 可统计分布的字段，均为 Snapshot.index 中的字段，性别按 GENDER_CODES 反向显示
+FACET_FIELDS = ("year", "contest_type", "level", "province", "enroll_middle", "ccf_level", "gender")
+MAX_FACET_LIMIT = 100
+
+# 针对获奖记录的分布字段及其取值
+RECORD_FACETS = {
+    "year": lambda record: record.contest.year,
+    "contest_type": lambda record: record.contest.type,
+    "level": lambda record: record.level,
+    "province": lambda record: record.province,
+}
+
+def facet_counts(index, matched, fields, limit, records=None):
+    """统计 matched 中的选手在各字段上的分布
+
+    每个取值的计数为至少有一条记录（或本身）具有该取值的选手数，由 matched 与该取值位图的交集求得。
+    records 不为 None 时是 matched 中各选手满足搜索条件的记录列表，记录字段只按这些记录统计。
+    每个字段只保留计数最多的 limit 个取值，计数为 0 的取值不返回。
+    """
+    gender_names = {code: name for name, code in GENDER_CODES.items()}
+    ret = {}
+    for field in fields:
+        if records is not None and field in RECORD_FACETS:
+            value_of = RECORD_FACETS[field]
+            counter = Counter()
+            for oier_records in records:
+                counter.update({value_of(record) for record in oier_records})
+            counts = list(counter.items())
+        else:
+            counts = []
+            for value in index.values(field):
+                count = len(matched & index.get(field, value))
+                if count:
+                    counts.append((gender_names.get(value, value) if field == "gender" else value, count))
+        counts.sort(key=lambda item: (-item[1], str(item[0])))
+        ret[field] = {str(value): count for value, count in counts[:limit]}
+    return ret
+
+def search_record_matcher(search_type, query):
+    """获取判断获奖记录是否匹配搜索条件的函数，不按记录搜索的类型返回 None"""
+    if search_type == "school":
         # 按学校搜索
-        for oier in OIer.get_all():
-            for record in oier.records:
-                if record.school and query in record.school.name.lower():
-                    results.append(oier)
-                    break
-            if len(results) >= request.limit:
-                break
-    
-    elif request.search_type == "contest":
+        return lambda record: record.school is not None and query in record.school.name.lower()
+    if search_type == "contest":
         # 按比赛搜索
-        for oier in OIer.get_all():
-            for record in oier.records:
-                if (query in record.contest.name.lower() or 
-                    query in record.contest.type.lower()):
-                    results.append(oier)
-                    break
-            if len(results) >= request.limit:
-                break
-    
-    elif request.search_type == "province":
+        return lambda record: query in record.contest.name.lower() or query in record.contest.type.lower()
+    if search_type == "province":
         # 按省份搜索
-        for oier in OIer.get_all():
-            for record in oier.records:
-                if record.province and query in record.province.lower():
-                    results.append(oier)
-                    break
-            if len(results) >= request.limit:
-                break
-    
+        return lambda record: bool(record.province) and query in record.province.lower()
+    return None
+
+def search_matcher(search_type, query):
+    """获取判断选手是否匹配搜索条件的函数，未知的搜索类型返回 None"""
+    if search_type == "name":
+        # 按姓名搜索（支持模糊匹配）
+        return lambda oier: query in oier.name.lower()
+    match_record = search_record_matcher(search_type, query)
+    if match_record is not None:
+        return lambda oier: any(match_record(record) for record in oier.records)
+    return None
+
+def search_oiers_sync(snapshot, request, position):
+    """/search 的计算部分，在工作线程中执行"""
+    query = request.query.lower().strip()
+    match = search_matcher(request.search_type, query)
+    match_record = search_record_matcher(request.search_type, query)
+
+    # 统计全部匹配以给出准确的 total；snapshot.oiers 按 DB 评分排序，匹配结果保持该顺序
+    records = None
+    if match_record is not None and request.facets:
+        # 按记录搜索时，记录字段的分布只统计满足条件的记录，需同时收集这些记录
+        positions, records = [], []
+        for p, oier in enumerate(snapshot.oiers):
+            matching = [record for record in oier.records if match_record(record)]
+            if matching:
+                positions.append(p)
+                records.append(matching)
+    else:
+        positions = [p for p, oier in enumerate(snapshot.oiers) if match(oier)] if match else []
+    matches = [snapshot.oiers[p] for p in positions]
+    start = 0 if position is None else snapshot.seek(matches, "oierdb", position)
+    end = min(start + request.limit, len(matches))
+    next_cursor = encode_cursor("oierdb", matches[end - 1]) if start < end < len(matches) else None
+
     # 转换为AwardInfo格式
-    award_infos = []
-    for oier in results:
-        records_out = []
-        for rec in oier.records:
-            records_out.append({
-                "contest_name": rec.contest.name,
-                "contest_type": rec.contest.type,
-                "year": rec.contest.year,
-                "score": rec.score,
-                "rank": rec.rank,
-                "level": rec.level,
-                "province": rec.province,
-                "school": rec.school.name if rec.school else None,
-            })
-        
-        award_infos.append(
-            AwardInfo(
-                name=oier.name,
-                gender="男" if oier.gender == 1 else ("女" if oier.gender == -1 else ""),
-                enroll_middle=oier.enroll_middle if oier.enroll_middle else 0,
-                oierdb_score=float(oier.oierdb_score) if hasattr(oier, "oierdb_score") else 0.0,
-                ccf_score=float(oier.ccf_score) if hasattr(oier, "ccf_score") else 0.0,
-                ccf_level=int(oier.ccf_level) if hasattr(oier, "ccf_level") else 0,
-                records=records_out,
-            )
-        )
-    
-    return SearchResult(total=len(award_infos), results=award_infos)
+    award_infos = [to_award_info(oier) for oier in matches[start:end]]
 
-@app.post("/ranking", response_model=List[AwardInfo])
-async def get_ranking(request: RankingRequest):
-    """获取选手排行榜API"""
-    load_data()
-    
-    from oier import OIer
-    
-    all_oiers = OIer.get_all()
-    
-    # 根据评分类型排序
-    if request.score_type == "oierdb":
-        sorted_oiers = sorted(all_oiers, 
-                            key=lambda x: getattr(x, 'oierdb_score', 0), 
-                            reverse=True)
-    elif request.score_type == "ccf":
-        sorted_oiers = sorted(all_oiers, 
-                            key=lambda x: getattr(x, 'ccf_score', 0), 
-                            reverse=True)
+    # 分布统计基于全部匹配结果，与分页无关
+    facets = None
+    if request.facets:
+        matched = Bitmap.of(len(snapshot.oiers), positions)
+        facets = facet_counts(snapshot.index, matched, dict.fromkeys(request.facets), request.facet_limit, records)
+
+    return render(
+        SearchResult(total=len(matches), results=award_infos, next_cursor=next_cursor, facets=facets), SearchResult
+    )
+
+@app.post("/query/advanced", response_model=SearchResult)
+async def advanced_query(request: AdvancedQueryRequest):
+    """组合条件查询API - 各条件同时满足，结果按 DB 评分排序，可用游标翻页"""
+    if request.limit < 0:
+        raise HTTPException(status_code=400, detail="limit不能为负数")
+    if request.gender is not None and request.gender not in GENDER_CODES:
+        raise HTTPException(status_code=400, detail="gender只能为男、女或未知")
+    position = None if request.cursor is None else decode_cursor(request.cursor, "oierdb")
+
+    snapshot = await require_data()
+    return await run_advanced_query(snapshot, request, position)
+
+async def run_advanced_query(snapshot, request, position):
+    key = ("advanced", request.model_dump_json(exclude={"cursor"}), position)
+    return await cached_query(snapshot, key, advanced_query_sync, request, position)
+
+def advanced_filters(index, request):
+    """将查询条件转换为位图列表与记录级检查函数列表"""
+    bitmaps, checks = [], []
+    if request.province is not None:
+        bitmaps.append(index.get("province", request.province))
+        checks.append(lambda record: record.province == request.province)
+    if request.school is not None:
+        bitmaps.append(index.get("school", request.school))
+        checks.append(lambda record: record.school is not None and record.school.name == request.school)
+    if request.school_id is not None:
+        bitmaps.append(index.get("school_id", request.school_id))
+        checks.append(lambda record: record.school is not None and record.school.id == request.school_id)
+    if request.contest_type is not None:
+        bitmaps.append(index.get("contest_type", request.contest_type))
+        checks.append(lambda record: record.contest.type == request.contest_type)
+    if request.year_min is not None or request.year_max is not None:
+        year_min = -math.inf if request.year_min is None else request.year_min
+        year_max = math.inf if request.year_max is None else request.year_max
+        years = [year for year in index.values("year") if year_min <= year <= year_max]
+        bitmaps.append(index.union("year", years))
+        checks.append(lambda record: year_min <= record.contest.year <= year_max)
+    if request.level is not None:
+        bitmaps.append(index.get("level", request.level))
+        checks.append(lambda record: record.level == request.level)
+    if request.min_ccf_level is not None:
+        levels = [level for level in index.values("ccf_level") if level >= request.min_ccf_level]
+        bitmaps.append(index.union("ccf_level", levels))
+    if request.enroll_middle is not None:
+        bitmaps.append(index.get("enroll_middle", request.enroll_middle))
+    if request.gender is not None:
+        bitmaps.append(index.get("gender", GENDER_CODES[request.gender]))
+    return bitmaps, checks
+
+def advanced_query_sync(snapshot, request, position):
+    """/query/advanced 的计算部分，在工作线程中执行"""
+    bitmaps, checks = advanced_filters(snapshot.index, request)
+
+    # 从最小的位图开始求交集
+    candidates = Bitmap.full(len(snapshot.oiers))
+    for bitmap in sorted(bitmaps, key=len):
+        candidates = candidates & bitmap
+    start = 0 if position is None else snapshot.seek(snapshot.oiers, "oierdb", position)
+
+    if len(checks) > 1:
+        # 位图只保证每个记录级条件分别被某条记录满足，须确认存在同时满足全部条件的记录
+        positions = [
+            p
+            for p in candidates
+            if any(all(check(record) for check in checks) for record in snapshot.oiers[p].records)
+        ]
+        total = len(positions)
+        first = bisect.bisect_left(positions, start)
+        page = positions[first : first + request.limit + 1]
     else:
+        total = len(candidates)
+        page = list(itertools.islice(candidates.from_position(start), request.limit + 1))
+
+    # 多取一个以判断是否还有下一页
+    has_next = len(page) > request.limit
+    page = [snapshot.oiers[p] for p in page[: request.limit]]
+    next_cursor = encode_cursor("oierdb", page[-1]) if has_next and page else None
+
+    award_infos = [to_award_info(oier) for oier in page]
+    return render(SearchResult(total=total, results=award_infos, next_cursor=next_cursor), SearchResult)
+
+@app.post("/ranking", response_model=List[AwardInfo])
+async def get_ranking(request: RankingRequest, raw_request: Request, stream: bool = False):
+    """获取选手排行榜API - 支持 NDJSON 流式输出"""
+    return await ranking_response(request, raw_request, stream)
+
+@app.get("/ranking", response_model=List[AwardInfo])
+async def get_ranking_cacheable(
+    raw_request: Request,
+    score_type: str = "oierdb",
+    limit: int = 100,
+    offset: int = 0,
+    cursor: Optional[str] = None,
+    stream: bool = False,
+):
+    """获取选手排行榜API - 参数通过查询字符串传递，可被 HTTP 缓存"""
+    request = RankingRequest(score_type=score_type, limit=limit, offset=offset, cursor=cursor)
+    return await ranking_response(request, raw_request, stream)
+
+async def ranking_response(request, raw_request, stream):
+    if request.score_type not in Snapshot.OIER_RANKINGS:
         raise HTTPException(status_code=400, detail="Invalid score_type")
-    
-    # 分页
-    start_idx = request.offset
-    end_idx = min(start_idx + request.limit, len(sorted_oiers))
-    page_oiers = sorted_oiers[start_idx:end_idx]
-    
-    # 转换为AwardInfo格式
-    results = []
-    for oier in page_oiers:
-        records_out = []
-        for rec in oier.records:
-            records_out.append({
-                "contest_name": rec.contest.name,
-                "contest_type": rec.contest.type,
-                "year": rec.contest.year,
-                "score": rec.score,
-                "rank": rec.rank,
-                "level": rec.level,
-                "province": rec.province,
-                "school": rec.school.name if rec.school else None,
-            })
-        
-        results.append(
-            AwardInfo(
-                name=oier.name,
-                gender="男" if oier.gender == 1 else ("女" if oier.gender == -1 else ""),
-                enroll_middle=oier.enroll_middle if oier.enroll_middle else 0,
-                oierdb_score=float(oier.oierdb_score) if hasattr(oier, "oierdb_score") else 0.0,
-                ccf_score=float(oier.ccf_score) if hasattr(oier, "ccf_score") else 0.0,
-                ccf_level=int(oier.ccf_level) if hasattr(oier, "ccf_level") else 0,
-                records=records_out,
-            )
-        )
-    
-    return results
+    if request.limit < 0 or request.offset < 0:
+        raise HTTPException(status_code=400, detail="limit和offset不能为负数")
+
+    snapshot = await require_data()
+    # 排序在加载时已完成，游标通过二分定位，每页的开销只与 limit 有关
+    ranking = snapshot.oier_ranking(request.score_type)
+    if request.cursor is not None:
+        start = snapshot.seek(ranking, request.score_type, decode_cursor(request.cursor, request.score_type))
+    else:
+        start = min(request.offset, len(ranking))
+    end = min(start + request.limit, len(ranking))
+
+    if wants_stream(raw_request, stream):
+        response = stream_response(itertools.islice(ranking, start, end), to_award_info, AwardInfo)
+    else:
+        response = await run_in_pool(get_ranking_sync, ranking, start, end)
+    if start < end < len(ranking):
+        response.headers["X-Next-Cursor"] = encode_cursor(request.score_type, ranking[end - 1])
+    return response
+
+def get_ranking_sync(ranking, start, end):
+    """/ranking 的计算部分，在工作线程中执行"""
+    return render([to_award_info(oier) for oier in ranking[start:end]], List[AwardInfo])
 
 @app.get("/contests", response_model=List[ContestInfo])
-async def get_contests():
-    """获取所有比赛信息API"""
-    load_data()
-    
-    from contest import Contest
-    
-    contests = Contest.__all_contests_list__
-    contest_infos = []
-    
-    for contest in contests:
-        contest_infos.append(
-            ContestInfo(
-                name=contest.name,
-                type=contest.type,
-                year=contest.year,
-                contestants_count=contest.n_contestants()
-            )
+async def get_contests(raw_request: Request, stream: bool = False):
+    """获取所有比赛信息API - 支持 NDJSON 流式输出"""
+    snapshot = await require_data()
+    if wants_stream(raw_request, stream):
+        return stream_response(snapshot.contests, to_contest_info, ContestInfo)
+    return await cached_response(raw_request, snapshot, "/contests", get_contests_sync, snapshot)
+
+def to_contest_info(contest):
+    return ContestInfo(
+        id=contest.id,
+        name=contest.name,
+        type=contest.type,
+        year=contest.year,
+        contestants_count=contest.n_contestants()
+    )
+
+def get_contests_sync(snapshot):
+    """/contests 的计算部分，在工作线程中执行"""
+    return render([to_contest_info(contest) for contest in snapshot.contests], List[ContestInfo])
+
+@app.get("/contests/{contest_id}/results", response_model=ContestResults)
+async def get_contest_results(contest_id: int, limit: int = 100, offset: int = 0):
+    """获取比赛成绩API - 按排名分页，附带各奖项分数线"""
+    if limit < 0 or offset < 0:
+        raise HTTPException(status_code=400, detail="limit和offset不能为负数")
+
+    snapshot = await require_data()
+    if not 0 <= contest_id < len(snapshot.contests):
+        raise HTTPException(status_code=404, detail="比赛不存在")
+    return await run_in_pool(get_contest_results_sync, snapshot.contests[contest_id], limit, offset)
+
+def get_contest_results_sync(contest, limit, offset):
+    """/contests/{id}/results 的计算部分，在工作线程中执行"""
+    # 选手在加载时已按排名排序，分页只需切片
+    results = [
+        ContestResultInfo(
+            rank=record.rank,
+            uid=record.oier.uid,
+            name=record.oier.name,
+            score=record.score,
+            level=record.level,
+            province=record.province,
+            school=record.school.name if record.school else None,
         )
-    
-    return contest_infos
+        for record in contest.contestants[offset:offset + limit]
+    ]
+    cutoffs = [
+        LevelCutoff(level=level, count=count, rank=record.rank, score=record.score)
+        for level, count, record in contest.level_cutoffs()
+    ]
+    return render(
+        ContestResults(
+            id=contest.id,
+            name=contest.name,
+            type=contest.type,
+            year=contest.year,
+            total=len(contest.contestants),
+            cutoffs=cutoffs,
+            results=results,
+        ),
+        ContestResults,
+    )
 
 @app.get("/schools", response_model=List[SchoolInfo])
-async def get_schools():
-    """获取所有学校信息API"""
-    load_data()
-    
-    from school import School
-    from oier import OIer
-    
-    schools = School.get_all()
-    school_infos = []
-    
-    # 统计每个学校的学生数量
-    school_student_count = {}
-    for oier in OIer.get_all():
-        for record in oier.records:
-            if record.school:
-                school_name = record.school.name
-                if school_name not in school_student_count:
-                    school_student_count[school_name] = set()
-                school_student_count[school_name].add(oier.name)
-    
-    for school in schools:
-        student_count = len(school_student_count.get(school.name, set()))
-        school_infos.append(
-            SchoolInfo(
-                name=school.name,
-                province=school.province,
-                city=school.city,
-                student_count=student_count
-            )
+async def get_schools(raw_request: Request, stream: bool = False):
+    """获取所有学校信息API - 支持 NDJSON 流式输出"""
+    snapshot = await require_data()
+    counts = snapshot.school_student_counts
+    convert = lambda school: to_school_info(school, counts)
+    if wants_stream(raw_request, stream):
+        return stream_response(snapshot.schools, convert, SchoolInfo)
+    return await cached_response(raw_request, snapshot, "/schools", get_schools_sync, snapshot, convert)
+
+def to_school_info(school, counts):
+    return SchoolInfo(
+        name=school.name,
+        province=school.province,
+        city=school.city,
+        student_count=counts.get(school.name, 0)
+    )
+
+def get_schools_sync(snapshot, convert):
+    """/schools 的计算部分，在工作线程中执行"""
+    return render([convert(school) for school in snapshot.schools], List[SchoolInfo])
+
+@app.get("/schools/ranking", response_model=SchoolRankingResult)
+async def get_school_ranking(province: Optional[str] = None, city: Optional[str] = None, limit: int = 100, offset: int = 0):
+    """获取学校排行榜API - 支持按省份、城市筛选"""
+    if limit < 0 or offset < 0:
+        raise HTTPException(status_code=400, detail="limit和offset不能为负数")
+    if city is not None and province is None:
+        raise HTTPException(status_code=400, detail="按城市筛选时须同时指定province")
+
+    snapshot = await require_data()
+
+    # 排行在加载时已预先计算，分页只需切片
+    ranking = snapshot.school_ranking(province, city)
+    results = [
+        SchoolRankingInfo(
+            rank=offset + i + 1,
+            id=school.id,
+            name=school.name,
+            province=school.province,
+            city=school.city,
+            score=float(school.score),
         )
-    
-    return school_infos
+        for i, school in enumerate(ranking[offset:offset + limit])
+    ]
+
+    return SchoolRankingResult(total=len(ranking), results=results)
+
+@app.get("/schools/{school_id}/oiers", response_model=SearchResult)
+async def get_school_oiers(
+    school_id: int,
+    year_min: Optional[int] = None,
+    year_max: Optional[int] = None,
+    contest_type: Optional[str] = None,
+    limit: int = 50,
+    cursor: Optional[str] = None,
+):
+    """获取学校选手名单API - 在该校获奖过的选手，按 DB 评分排序，可按年份与比赛类型筛选"""
+    if limit < 0:
+        raise HTTPException(status_code=400, detail="limit不能为负数")
+    position = None if cursor is None else decode_cursor(cursor, "oierdb")
+
+    snapshot = await require_data()
+    if not 0 <= school_id < len(snapshot.schools):
+        raise HTTPException(status_code=404, detail="学校不存在")
+    # 以学校 ID 的位图为基础，与年份、比赛类型条件求交集；条件须由该校的同一条记录满足
+    request = AdvancedQueryRequest(
+        school_id=school_id, year_min=year_min, year_max=year_max, contest_type=contest_type, limit=limit
+    )
+    return await run_advanced_query(snapshot, request, position)
+
+SUGGEST_TYPES = {"oier": "oiers", "school": "schools", "contest": "contests"}
+
+@app.get("/suggest", response_model=SuggestResult)
+async def suggest(prefix: str, suggest_type: Optional[str] = None, limit: int = SUGGEST_LIMIT):
+    """输入补全API - 按前缀补全选手姓名（或拼音首字母）、学校名称（或别名）和比赛名称"""
+    if not 0 <= limit <= SUGGEST_LIMIT:
+        raise HTTPException(status_code=400, detail=f"limit须在0到{SUGGEST_LIMIT}之间")
+    if suggest_type is not None and suggest_type not in SUGGEST_TYPES:
+        raise HTTPException(status_code=400, detail=f"不支持的补全类型: {suggest_type}")
+
+    snapshot = await require_data()
+    # 每个前缀的前若干名在加载时已求出，查询只需沿前缀走过至多 len(prefix) 个节点，直接在事件循环中完成
+    prefix = prefix.lower().strip()
+    fields = SUGGEST_TYPES.values() if suggest_type is None else [SUGGEST_TYPES[suggest_type]]
+    result = SuggestResult(**{field: snapshot.suggestions[field].complete(prefix, limit) for field in fields})
+    return render(result, SuggestResult)
 
 @app.get("/stats")
-async def get_statistics():
+async def get_statistics(raw_request: Request):
     """获取系统统计信息API"""
-    load_data()
-    
-    from oier import OIer
-    from contest import Contest
-    from school import School
-    
+    snapshot = await require_data()
+    return await cached_response(raw_request, snapshot, "/stats", get_statistics_sync, snapshot)
+
+def get_statistics_sync(snapshot):
+    """/stats 的计算部分，在工作线程中执行"""
     # 基础统计
-    total_oiers = len(OIer.get_all())
-    total_contests = len(Contest.__all_contests_list__)
-    total_schools = len(School.get_all())
+    total_oiers = len(snapshot.oiers)
+    total_contests = len(snapshot.contests)
+    total_schools = len(snapshot.schools)
     
     # 按性别统计
     gender_stats = {"男": 0, "女": 0, "未知": 0}
-    for oier in OIer.get_all():
+    for oier in snapshot.oiers:
         if oier.gender == 1:
             gender_stats["男"] += 1
         elif oier.gender == -1:
@@ -441,7 +1268,7 @@ async def get_statistics():
     
     # 按省份统计
     province_stats = {}
-    for oier in OIer.get_all():
+    for oier in snapshot.oiers:
         for record in oier.records:
             if record.province:
                 province_stats[record.province] = province_stats.get(record.province, 0) + 1
@@ -449,14 +1276,14 @@ async def get_statistics():
     
     # 按比赛类型统计
     contest_type_stats = {}
-    for contest in Contest.__all_contests_list__:
+    for contest in snapshot.contests:
         contest_type = contest.type
         if contest_type not in contest_type_stats:
             contest_type_stats[contest_type] = {"count": 0, "total_contestants": 0}
         contest_type_stats[contest_type]["count"] += 1
         contest_type_stats[contest_type]["total_contestants"] += contest.n_contestants()
     
-    return {
+    return JSONResponse({
         "basic_stats": {
             "total_oiers": total_oiers,
             "total_contests": total_contests,
@@ -465,4 +1292,4 @@ async def get_statistics():
         "gender_distribution": gender_stats,
         "province_distribution": dict(sorted(province_stats.items(), key=lambda x: x[1], reverse=True)[:10]),  # 前10个省份
         "contest_type_stats": contest_type_stats
-    }
\ No newline at end of file
+    })
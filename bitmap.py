@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+# -*- coding: UTF-8 -*-
+
+from array import array
+import bisect
+
+"每个字节值中为 1 的位的下标，用于枚举稠密位图中的元素。"
+__byte_bits__ = [tuple(bit for bit in range(8) if value >> bit & 1) for value in range(256)]
+
+
+class Bitmap:
+    """定长的整数集合，元素为 [0, size) 中的下标。
+
+    元素较多时以 Python 整数按位存储（稠密），较少时以有序的 array('I') 存储（稀疏），
+    取两者中占用空间较小的一种。集合是不可变的，运算返回新的位图；遍历按下标升序进行。
+    """
+
+    __slots__ = ("size", "bits", "positions")
+
+    def __init__(self, size, bits=None, positions=None):
+        """新建位图，bits 与 positions 至多指定一个，都不指定时为空集。
+
+        size: 下标上限。
+        bits: 稠密表示的整数。
+        positions: 稀疏表示的有序下标数组。
+        """
+
+        self.size = size
+        self.bits = bits
+        self.positions = positions if bits is not None or positions is not None else array("I")
+
+    @staticmethod
+    def of(size, positions):
+        """由升序且不重复的下标序列建立位图，自动选择存储方式。
+
+        size: 下标上限。
+        positions: 下标序列。
+        """
+
+        positions = array("I", positions)
+        if len(positions) * 32 <= size:
+            return Bitmap(size, positions=positions)
+        data = bytearray((size + 7) >> 3)
+        for p in positions:
+            data[p >> 3] |= 1 << (p & 7)
+        return Bitmap(size, bits=int.from_bytes(data, "little"))
+
+    @staticmethod
+    def full(size):
+        "包含全部下标的位图。"
+
+        return Bitmap(size, bits=(1 << size) - 1)
+
+    def is_dense(self):
+        return self.bits is not None
+
+    def __len__(self):
+        return self.bits.bit_count() if self.is_dense() else len(self.positions)
+
+    def __to_bytes__(self):
+        return self.bits.to_bytes((self.size + 7) >> 3, "little")
+
+    def __to_int__(self):
+        if self.is_dense():
+            return self.bits
+        data = bytearray((self.size + 7) >> 3)
+        for p in self.positions:
+            data[p >> 3] |= 1 << (p & 7)
+        return int.from_bytes(data, "little")
+
+    def __iter__(self):
+        if not self.is_dense():
+            yield from self.positions
+            return
+        for i, byte in enumerate(self.__to_bytes__()):
+            if byte:
+                base = i << 3
+                for bit in __byte_bits__[byte]:
+                    yield base + bit
+
+    def __and__(self, other):
+        if self.is_dense() and other.is_dense():
+            return Bitmap(self.size, bits=self.bits & other.bits)
+        if self.is_dense():
+            self, other = other, self
+        if other.is_dense():
+            # 稀疏与稠密：逐个检查稀疏一侧的元素
+            data = other.__to_bytes__()
+            return Bitmap(
+                self.size, positions=array("I", (p for p in self.positions if data[p >> 3] >> (p & 7) & 1))
+            )
+        small, large = sorted((self.positions, other.positions), key=len)
+        large = set(large)
+        return Bitmap(self.size, positions=array("I", (p for p in small if p in large)))
+
+    def __or__(self, other):
+        if not self.is_dense() and not other.is_dense():
+            positions = sorted(set(self.positions).union(other.positions))
+            return Bitmap.of(self.size, positions)
+        return Bitmap(self.size, bits=self.__to_int__() | other.__to_int__())
+
+    def from_position(self, start):
+        """获取其中不小于 start 的元素组成的位图。
+
+        start: 起始下标。
+        """
+
+        if self.is_dense():
+            return Bitmap(self.size, bits=self.bits >> start << start)
+        return Bitmap(self.size, positions=self.positions[bisect.bisect_left(self.positions, start) :])
+
+
+class BitmapIndex:
+    """按 (字段, 取值) 建立的位图索引。
+
+    建立时按下标升序调用 add，之后调用 freeze 将各取值的下标列表转换为位图。
+    """
+
+    def __init__(self, size):
+        """新建索引。
+
+        size: 下标上限，即被索引对象的数量。
+        """
+
+        self.size = size
+        self.__postings__ = {}
+        self.__values__ = {}
+
+    def add(self, field, value, position):
+        """记录下标为 position 的对象在 field 上具有取值 value。
+
+        同一对象的同一取值可重复添加，position 须不小于之前添加过的下标。
+        """
+
+        postings = self.__postings__.setdefault((field, value), [])
+        if not postings or postings[-1] != position:
+            postings.append(position)
+
+    def freeze(self):
+        "将所有下标列表转换为位图。"
+
+        self.__postings__ = {key: Bitmap.of(self.size, postings) for key, postings in self.__postings__.items()}
+        for field, value in self.__postings__:
+            self.__values__.setdefault(field, []).append(value)
+
+    def get(self, field, value):
+        """获取在 field 上取值为 value 的对象组成的位图，不存在时为空集。"""
+
+        return self.__postings__.get((field, value)) or Bitmap(self.size)
+
+    def union(self, field, values):
+        """获取在 field 上取值为 values 中任意一个的对象组成的位图。"""
+
+        ret = Bitmap(self.size)
+        for value in values:
+            if (field, value) in self.__postings__:
+                ret = ret | self.__postings__[(field, value)]
+        return ret
+
+    def values(self, field):
+        "获取 field 上出现过的所有取值，须先调用 freeze。"
+
+        return self.__values__.get(field, [])
@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+# -*- coding: UTF-8 -*-
+
+from collections import OrderedDict
+import asyncio
+import threading
+import time
+
+
+class ResponseCache:
+    """进程内的响应缓存。
+
+    按编码后的响应体大小限制总容量，超出时淘汰最久未使用的项；每项在 ttl 秒后过期。
+    同一个键的并发请求只计算一次，其余请求等待并共享结果。
+
+    get_or_compute 须在事件循环中调用；clear 可在任意线程中调用。
+    """
+
+    def __init__(self, max_bytes, ttl):
+        """新建缓存。
+
+        max_bytes: 缓存响应体的总字节数上限，为 0 时不缓存（仍合并并发请求）。
+        ttl: 缓存项的存活秒数，为 0 时不过期。
+        """
+
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.evictions = 0
+        self.__entries__ = OrderedDict()
+        self.__inflight__ = {}
+        self.__generation__ = 0
+        self.__lock__ = threading.Lock()
+
+    def __lookup__(self, key):
+        with self.__lock__:
+            entry = self.__entries__.get(key)
+            if entry is None:
+                return None
+            expires, value = entry
+            if expires is not None and expires <= time.monotonic():
+                del self.__entries__[key]
+                self.size -= len(value[0])
+                return None
+            self.__entries__.move_to_end(key)
+            return value
+
+    def __store__(self, key, value, generation):
+        size = len(value[0])
+        if size > self.max_bytes:
+            return
+        expires = time.monotonic() + self.ttl if self.ttl > 0 else None
+        with self.__lock__:
+            if generation != self.__generation__:
+                return  # 计算期间缓存已失效，结果可能来自旧数据
+            if key in self.__entries__:
+                self.size -= len(self.__entries__.pop(key)[1][0])
+            self.__entries__[key] = (expires, value)
+            self.size += size
+            while self.size > self.max_bytes:
+                _, (_, evicted) = self.__entries__.popitem(last=False)
+                self.size -= len(evicted[0])
+                self.evictions += 1
+
+    async def get_or_compute(self, key, compute):
+        """获取缓存的值，未命中时调用 compute 计算并缓存。
+
+        key: 可哈希的键，须包含决定结果的全部请求参数。
+        compute: 无参数的协程函数，返回 (响应体, 附加信息)，响应体为 bytes。
+
+        返回值: compute 的返回值。compute 抛出的异常会传递给所有等待该键的请求，且不会被缓存。
+        """
+
+        while True:
+            value = self.__lookup__(key)
+            if value is not None:
+                self.hits += 1
+                return value
+            future = self.__inflight__.get(key)
+            if future is None:
+                break
+            self.coalesced += 1
+            try:
+                return await asyncio.shield(future)
+            except asyncio.CancelledError:
+                if not future.cancelled():
+                    raise
+                # 负责计算的请求被取消，重新尝试
+
+        self.misses += 1
+        future = asyncio.get_running_loop().create_future()
+        self.__inflight__[key] = future
+        generation = self.__generation__
+        try:
+            value = await compute()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except BaseException as e:
+            future.set_exception(e)
+            future.exception()  # 没有其他请求等待时避免未读取异常的警告
+            raise
+        else:
+            future.set_result(value)
+            self.__store__(key, value, generation)
+            return value
+        finally:
+            del self.__inflight__[key]
+
+    def clear(self):
+        "清空缓存，正在进行的计算结果也不再写入。"
+
+        with self.__lock__:
+            self.__entries__ = OrderedDict()
+            self.size = 0
+            self.__generation__ += 1
+
+    def stats(self):
+        "获取缓存的统计信息。"
+
+        lookups = self.hits + self.misses + self.coalesced
+        return {
+            "entries": len(self.__entries__),
+            "bytes": self.size,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "evictions": self.evictions,
+            "hit_rate": (self.hits + self.coalesced) / lookups if lookups else 0.0,
+        }
@@ -5,6 +5,7 @@ from collections import Counter
 from record import Record
 from sys import stderr
 import re
+import util
 
 __re_score_with_rank__ = re.compile(r"^(\d+\.?\d+)\(rk(\d+)\)$")
 
@@ -23,6 +24,7 @@ class Contest:
         self.capacity = settings.get("capacity")
         self.contestants = []
         self.level_counts = Counter()
+        self.__coefficients__ = None
 
     @staticmethod
     def create(settings):
@@ -37,6 +39,13 @@ class Contest:
         Contest.__all_contests_map__[contest.name] = contest
         return contest
 
+    @staticmethod
+    def clear():
+        "清空数据。"
+
+        Contest.__all_contests_list__ = []
+        Contest.__all_contests_map__ = {}
+
     @staticmethod
     def by_name(name):
         """根据名称返回比赛
@@ -83,6 +92,60 @@ class Contest:
 
         return self.capacity if self.capacity else len(self.contestants)
 
+    def coefficient(self, rank, name=None):
+        """获取该比赛中某一排名对 DB 评分的贡献系数，即衰变系数、排名系数、比赛类型系数之积。
+
+        系数表在首次调用时根据当前选手总数建立，选手总数变化后自动重建。
+
+        rank: 排名。
+        name: 姓名，用于输出错误信息，无需用到。
+        """
+
+        n = self.n_contestants()
+        if self.__coefficients__ is None or self.__coefficients__[0] != n:
+            self.__build_coefficients__(n)
+        _, dc, tc, table = self.__coefficients__
+        if 1 <= rank <= n:
+            return table[rank]
+        return dc * util.rank_coefficient(rank, n, name) * tc
+
+    def __build_coefficients__(self, n):
+        dc = util.decay_coefficient(self.year)
+        tc = util.contest_type_coefficient(self.type, self.name)  # 比赛类型未知时只在建表时警告一次
+        products = {}
+        table = [None] * (n + 1)
+        for rank in range(1, n + 1):
+            rc = util.rank_coefficient(rank, n)
+            if rc not in products:
+                products[rc] = dc * rc * tc
+            table[rank] = products[rc]
+        self.__coefficients__ = (n, dc, tc, table)
+
+    def sort_contestants(self):
+        "将选手按排名排序，排名相同时按用户 ID 排序。"
+
+        self.contestants.sort(key=lambda record: (record.rank, record.oier.uid))
+
+    def level_cutoffs(self):
+        """根据各奖项人数获取分数线，需先按排名排序选手。
+
+        奖项按 util.award_levels 中的顺序从高到低排列，非标准奖项不计入；第 k 个奖项的分数线为
+        前 k 个奖项人数之和处的记录。
+
+        返回值: 列表，每项为 (奖项, 人数, 该奖项最后一名的记录)。
+        """
+
+        table = util.award_level_table
+        levels = sorted(
+            (table.code(level), level) for level in self.level_counts if table.is_standard(table.code(level))
+        )
+        ret, position = [], 0
+        for _, level in levels:
+            position = min(position + self.level_counts[level], len(self.contestants))
+            if position > 0:
+                ret.append((level, self.level_counts[level], self.contestants[position - 1]))
+        return ret
+
     def add_contestant(self, oier, score, level, grades, school, province, gender):
         """添加一名选手到比赛。
 
@@ -123,7 +186,17 @@ class Contest:
                     )
                 rank = len(self.contestants) + 1
 
-        record = Record(oier, self, score, rank, level, grades, school, province, gender)
+        record = Record(
+            oier,
+            self,
+            score,
+            rank,
+            util.award_level_table.code(level),
+            grades,
+            school,
+            util.province_table.code(province),
+            gender,
+        )
         self.contestants.append(record)
         self.level_counts[level] += 1
         return record
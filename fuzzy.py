@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+# -*- coding: UTF-8 -*-
+
+
+def __deletions__(name):
+    "name 本身及删去其中一个字符得到的各个字符串（不重复）。"
+
+    return dict.fromkeys([name] + [name[:i] + name[i + 1 :] for i in range(len(name))])
+
+
+def __within_one_edit__(a, b):
+    "判断 a 与 b 能否通过至多一次插入、删除、替换或相邻字符交换互相转换。"
+
+    if len(a) > len(b):
+        a, b = b, a
+    if len(b) - len(a) > 1:
+        return False
+    i = 0
+    while i < len(a) and a[i] == b[i]:
+        i += 1
+    if len(a) < len(b):
+        return a[i:] == b[i + 1 :]
+    # 等长：替换第 i 个字符，或交换第 i 与第 i + 1 个字符
+    return a[i + 1 :] == b[i + 1 :] or (
+        i + 1 < len(a) and a[i] == b[i + 1] and a[i + 1] == b[i] and a[i + 2 :] == b[i + 2 :]
+    )
+
+
+def __substitutions__(a, b):
+    "等长字符串 a 与 b 中不同字符的个数。"
+
+    return sum(x != y for x, y in zip(a, b))
+
+
+class FuzzyNameIndex:
+    """查找相近姓名的索引。
+
+    编辑距离（插入、删除、替换、相邻字符交换各计一次）为 1 的姓名采用删除邻域查找：每个姓名本身及删去一个字符
+    得到的各个字符串都指向该姓名，两个姓名的编辑距离不超过 1 时，它们的删除邻域必有交集，查询时只需检查交集中的候选。
+
+    另按 (长度, 拼音首字母) 分组，查找首字母相同、至多替换 max_substitutions 个字的姓名，用于发现同音字造成的错误；
+    替换的字数还须少于姓名长度，否则两字姓名会匹配到首字母相同的所有姓名。
+    """
+
+    def __init__(self, max_substitutions=2):
+        """新建索引。
+
+        max_substitutions: 首字母相同的姓名最多允许的不同字数，实际不超过姓名长度减一。
+        """
+
+        self.max_substitutions = max_substitutions
+        self.__neighborhoods__ = {}
+        self.__by_initials__ = {}
+
+    def add(self, name, initials):
+        """加入姓名，同一姓名只须加入一次。
+
+        name: 姓名。
+        initials: 姓名的拼音首字母。
+        """
+
+        for variant in __deletions__(name):
+            self.__neighborhoods__.setdefault(variant, []).append(name)
+        self.__by_initials__.setdefault((len(name), initials), []).append(name)
+
+    def lookup(self, name, initials):
+        """查找与 name 相近的姓名，不含 name 本身。
+
+        name: 姓名。
+        initials: 姓名的拼音首字母。
+
+        返回值: {姓名: (距离, 拼音首字母是否相同)}。距离为编辑距离；首字母相同的姓名若替换了多个字，为不同的字数。
+        """
+
+        ret = {}
+        for variant in __deletions__(name):
+            for candidate in self.__neighborhoods__.get(variant, ()):
+                if candidate not in ret and candidate != name and __within_one_edit__(name, candidate):
+                    ret[candidate] = (1, False)
+        max_substitutions = min(self.max_substitutions, len(name) - 1)
+        for candidate in self.__by_initials__.get((len(name), initials), ()):
+            distance = __substitutions__(name, candidate)
+            if 0 < distance <= max_substitutions:
+                ret[candidate] = (min(distance, ret.get(candidate, (distance,))[0]), True)
+        return ret
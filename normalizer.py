@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+# -*- coding: UTF-8 -*-
+
+__translation__ = str.maketrans({"(": "（", ")": "）", " ": None, "　": None, "\t": None})
+
+"下列行政区全称用于剥离名称前缀，其余省级行政区按 <省份>、<省份>省、<省份>市 处理。"
+__province_full_names__ = {
+    "广西": ["广西壮族自治区", "广西自治区"],
+    "内蒙古": ["内蒙古自治区"],
+    "新疆": ["新疆维吾尔自治区", "新疆自治区"],
+    "宁夏": ["宁夏回族自治区", "宁夏自治区"],
+    "西藏": ["西藏自治区"],
+    "香港": ["香港特别行政区"],
+    "澳门": ["澳门特别行政区"],
+}
+__city_suffixes__ = ["自治州", "地区", "市", "区", "县", "盟"]
+
+
+def normalize(name):
+    """规范化学校名称：统一全半角括号，去除空白，并剥离 名称/机构 中的机构部分。
+
+    name: 学校名称。
+    """
+
+    name = name.translate(__translation__)
+    if "/" in name:
+        name, _ = name.split("/", 1)
+    return name
+
+
+def province_prefixes(province):
+    "获取省级行政区在学校名称中可能出现的前缀列表，按长度降序排列。"
+
+    if province == "":
+        return []
+    prefixes = {province, province + "省", province + "市"}
+    prefixes.update(__province_full_names__.get(province, []))
+    return sorted(prefixes, key=len, reverse=True)
+
+
+def city_prefixes(city):
+    "获取地级行政区（或区）在学校名称中可能出现的前缀列表，按长度降序排列。"
+
+    if city in ("", "未分区"):
+        return []
+    prefixes = {city}
+    for suffix in __city_suffixes__:
+        if city.endswith(suffix) and len(city) - len(suffix) >= 2:
+            prefixes.add(city[: -len(suffix)])
+            break
+    return sorted(prefixes, key=len, reverse=True)
+
+
+class Normalizer:
+    """离线学校名称规范化器。
+
+    以所有学校的正式名称与别名的逆序建立字典树，对输入名称从末尾开始做最长匹配；
+    匹配位置之前的部分须能够被解释为该学校的 <省份><城市> 前缀（均可省略），
+    从而将诸如 '湖南省长沙市雅礼中学'、'长沙雅礼中学' 的写法解析到已有学校，无需访问网络。
+    """
+
+    def __init__(self, schools):
+        """建立规范化器。
+
+        schools: 学校列表。
+        """
+
+        self.root = {}
+        self.size = 0
+        self.__prefix_cache__ = {}
+        for school in schools:
+            for key in [school.name] + school.aliases:
+                if key != "":
+                    self.__insert__(normalize(key), school)
+            self.size += 1
+
+    def __insert__(self, key, school):
+        node = self.root
+        for char in reversed(key):
+            node = node.setdefault(char, {})
+        terminal = node.setdefault(None, [])
+        if school not in terminal:
+            terminal.append(school)
+
+    def __region_prefixes__(self, school):
+        key = (school.province, school.city)
+        if key not in self.__prefix_cache__:
+            self.__prefix_cache__[key] = (province_prefixes(school.province), city_prefixes(school.city))
+        return self.__prefix_cache__[key]
+
+    def __is_region_prefix__(self, prefix, school):
+        if prefix == "":
+            return True
+        provinces, cities = self.__region_prefixes__(school)
+        for p in provinces + [""]:
+            if prefix.startswith(p):
+                rest = prefix[len(p) :]
+                if rest == "" or rest in cities:
+                    return True
+        return False
+
+    def matches(self, name):
+        """获取名称中所有可以作为后缀匹配的 (前缀, 候选学校列表)，按匹配长度降序排列。
+
+        name: 已规范化的学校名称。
+        """
+
+        node, ret = self.root, []
+        for i in range(len(name) - 1, -1, -1):
+            node = node.get(name[i])
+            if node is None:
+                break
+            if None in node:
+                ret.append((name[:i], node[None]))
+        ret.reverse()
+        return ret
+
+    def resolve(self, name, province=None):
+        """在本地解析学校名称。
+
+        name: 学校名称。
+        province: 省份，为 None 时不限制省份。
+
+        返回值: 唯一确定的学校，无法唯一确定时返回 None。
+        """
+
+        name = normalize(name)
+        for prefix, schools in self.matches(name):
+            candidates = [
+                school
+                for school in schools
+                if (province is None or school.province == province) and self.__is_region_prefix__(prefix, school)
+            ]
+            if len(candidates) == 1:
+                return candidates[0]
+            if len(candidates) > 1:
+                return None
+        return None
@@ -110,10 +110,7 @@ class OIer:
 
         s = util.D(0)
         for record in self.records:
-            dc = util.decay_coefficient(record.contest.year)
-            rc = util.rank_coefficient(record.rank, record.contest.n_contestants(), self.name)
-            tc = util.contest_type_coefficient(record.contest.type, self.name)
-            c = dc * rc * tc
+            c = record.contribution()
             record.school.score += c
             s += c
         self.oierdb_score = s
@@ -30,22 +30,54 @@ __grades_range__ = {
 
 class Record:
     __auto_increment__ = 0
+    __slots__ = (
+        "id",
+        "oier",
+        "contest",
+        "score",
+        "rank",
+        "level_code",
+        "grades",
+        "school",
+        "province_code",
+        "gender",
+        "ems",
+        "keep_grade_flag",
+    )
+
+    def __init__(self, oier, contest, score, rank, level_code, grades, school, province_code, gender):
+        """新建获奖记录。
+
+        level_code: 奖项在 util.award_level_table 中的编号。
+        province_code: 省级行政区在 util.province_table 中的编号。
+        """
 
-    def __init__(self, oier, contest, score, rank, level, grades, school, province, gender):
         Record.__auto_increment__ += 1
         self.id = Record.__auto_increment__
         self.oier = oier
         self.contest = contest
         self.score = score
         self.rank = rank
-        self.level = level
+        self.level_code = level_code
         self.grades = grades
         self.school = school
-        self.province = province
+        self.province_code = province_code
         self.gender = gender
         self.ems = util.enrollment_middle(contest, grades)
         self.keep_grade_flag = False
 
+    @property
+    def level(self):
+        "奖项名称。"
+
+        return util.award_level_table[self.level_code]
+
+    @property
+    def province(self):
+        "省级行政区。"
+
+        return util.province_table[self.province_code]
+
     def __repr__(self):
         return f"{self.oier.name}(pro={self.province},school={self.school.name},ems={self.ems},c={self.contest.name})"
 
@@ -53,27 +85,23 @@ class Record:
     def __score_format__(score):
         return "" if score is None else f"{score:.5g}"
 
-    @staticmethod
-    def __province_format__(province):
-        try:
-            return util.provinces.index(province)
-        except:
-            print(
-                f"\x1b[01;33mwarning: \x1b[0m未知的省级行政区：\x1b[0;32m'{province}'\x1b[0m",
-                file=stderr,
-            )
-            return province
-
-    @staticmethod
-    def __award_level_format__(level):
-        try:
-            return util.award_levels.index(level)
-        except:
-            print(
-                f"\x1b[01;33mwarning: \x1b[0m未知的奖项名称：\x1b[0;32m'{level}'\x1b[0m",
-                file=stderr,
-            )
-            return level
+    def __province_format__(self):
+        if util.province_table.is_standard(self.province_code):
+            return self.province_code
+        print(
+            f"\x1b[01;33mwarning: \x1b[0m未知的省级行政区：\x1b[0;32m'{self.province}'\x1b[0m",
+            file=stderr,
+        )
+        return self.province
+
+    def __award_level_format__(self):
+        if util.award_level_table.is_standard(self.level_code):
+            return self.level_code
+        print(
+            f"\x1b[01;33mwarning: \x1b[0m未知的奖项名称：\x1b[0;32m'{self.level}'\x1b[0m",
+            file=stderr,
+        )
+        return self.level
 
     def to_compress_format(self, reference_em):
         "转化成压缩格式字符串。"
@@ -83,8 +111,8 @@ class Record:
             self.school.id,
             Record.__score_format__(self.score),
             self.rank,
-            Record.__province_format__(self.province),
-            Record.__award_level_format__(self.level),
+            self.__province_format__(),
+            self.__award_level_format__(),
         )
         if self.keep_grade_flag:
             s += ";" + str(util.get_weighted_mode([self.ems])[0])
@@ -92,6 +120,11 @@ class Record:
             s += ":" + str(util.get_weighted_mode([self.ems])[0])
         return s
 
+    def contribution(self):
+        "获取该记录对 DB 评分的贡献。"
+
+        return self.contest.coefficient(self.rank, self.oier.name)
+
     def is_keep_grade(self):
         "获取该记录组是否为非正常年级 (如留级)。"
 
@@ -148,7 +181,7 @@ class Record:
                     (a.grades in __grades_range__["primary"] and b.grades in __grades_range__["primary"])
                     or (a.grades in __grades_range__["junior"] and b.grades in __grades_range__["junior"])
                     or (a.grades in __grades_range__["senior"] and b.grades in __grades_range__["senior"])
-                ) and a.province != b.province:
+                ) and a.province_code != b.province_code:
                     return inf
 
                 # 在同一学年中出现就读学校不一致、年级不一致的情况，不合并
@@ -183,7 +216,7 @@ class Record:
                         (a.grades == __grades_range__["senior"][2] and b.grades == __grades_range__["junior"][0])
                         or (a.grades == __grades_range__["junior"][0] and b.grades == __grades_range__["senior"][2])
                     )
-                    and a.province != b.province
+                    and a.province_code != b.province_code
                 ):
                     coeff = max(coeff , 3) # Tentative
 
@@ -204,7 +237,7 @@ class Record:
         
         schools = set(record.school.id for record in chain(A, B))
         locations = set(record.school.location() for record in chain(A, B))
-        provinces = set(record.province for record in chain(A, B))
+        provinces = set(record.province_code for record in chain(A, B))
         aem = util.get_mode([record.ems for record in A])
         bem = util.get_mode([record.ems for record in B])
         diff = min(abs(i - j) for i in aem for j in bem)
@@ -270,7 +303,7 @@ class Record:
 
         schools = set(record.school.id for record in chain(A, B))
         locations = set(record.school.location() for record in chain(A, B))
-        provinces = set(record.province for record in chain(A, B))
+        provinces = set(record.province_code for record in chain(A, B))
         penalty = __school_penalty__.get(len(schools), 600) + 80 * (len(locations) + len(provinces) - 3)
         if penalty >= 100:
             return 0
@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+# -*- coding: UTF-8 -*-
+
+"""
+批量解析学校名称，生成 data/school.txt 的修改建议
+
+输入文件每行格式为：<学校名称>,<省份>；解析结果逐条写入日志文件，中断后重新运行会跳过已解析的名称。
+日志中的学校以 (省份, 城市, 名称) 标识，data/school.txt 增删或调整行序后仍能对应到同一所学校。
+"""
+
+from school import School
+from sys import stderr
+import argparse
+import json
+import os
+
+
+def read_pairs(filename):
+    """读取待解析的 (名称, 省份) 列表，去除重复项。
+
+    filename: 输入文件名。
+    """
+
+    pairs, seen = [], set()
+    with open(filename, encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            name, _, province = line.partition(",")
+            if (name, province) not in seen:
+                seen.add((name, province))
+                pairs.append((name, province))
+    return pairs
+
+
+def read_journal(filename):
+    """读取日志中已解析的结果，忽略因中断而不完整的行。
+
+    filename: 日志文件名。
+
+    返回值: dict，键为 (名称, 省份)，值为日志中记录的解析结果，格式见 encode_candidate。
+    """
+
+    done = {}
+    try:
+        with open(filename, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                done[(entry["name"], entry["province"])] = entry["result"]
+    except FileNotFoundError:
+        pass
+    return done
+
+
+def school_key(school):
+    "学校在日志中的标识 [省份, 城市, 名称]，与学校在 data/school.txt 中的位置无关。"
+
+    return [school.province, school.city, school.name]
+
+
+def encode_candidate(candidate):
+    """将 School.find_candidate 的返回值转化为可写入日志的格式。
+
+    返回值: [类型, 学校标识或城市, 附加信息]，类型为 School.find_candidate 的标记，直接命中时为 "e"；
+    学校标识见 school_key。
+    """
+
+    if isinstance(candidate, School):
+        return ["e", school_key(candidate), None]
+    if candidate[0] == "c":
+        return ["c", candidate[1], None]
+    return [candidate[0], school_key(candidate[1]), candidate[2] if len(candidate) > 2 else None]
+
+
+def decode_result(result, schools):
+    """将日志中的解析结果还原为 (类型, 学校或城市, 附加信息)。
+
+    result: encode_candidate 的返回值。
+    schools: 以 (省份, 城市, 名称) 为键的学校映射。
+
+    返回值: 对应的学校已不存在时（或日志为记录学校 ID 的旧格式）为 None。
+    """
+
+    kind, target, extra = result
+    if kind == "c":
+        return kind, target, extra
+    school = schools.get(tuple(target)) if isinstance(target, list) else None
+    return None if school is None else (kind, school, extra)
+
+
+def resolve_all(pairs, journal):
+    """解析所有名称，每解析一个即追加到日志并落盘。
+
+    pairs: (名称, 省份) 列表。
+    journal: 日志文件名。
+
+    返回值: dict，键为 (名称, 省份)，值为 (类型, 学校或城市, 附加信息)。
+    """
+
+    schools = {tuple(school_key(school)): school for school in School.get_all()}
+    done = {}
+    for (name, province), result in read_journal(journal).items():
+        decoded = decode_result(result, schools)
+        if decoded is None:
+            print(f"warning: 日志中 {name} ({province}) 的解析结果 {result[1]} 已找不到对应的学校，将重新解析", file=stderr)
+        else:
+            done[(name, province)] = decoded
+    todo = [pair for pair in pairs if pair not in done]
+    print(f"共 {len(pairs)} 个名称，已完成 {len(pairs) - len(todo)} 个", file=stderr)
+    with open(journal, "a", encoding="utf-8") as f:
+        for i, (name, province) in enumerate(todo, 1):
+            result = encode_candidate(School.find_candidate(name, province))
+            done[(name, province)] = decode_result(result, schools)
+            print(json.dumps({"name": name, "province": province, "result": result}, ensure_ascii=False), file=f)
+            f.flush()
+            os.fsync(f.fileno())
+            print(f"[{i}/{len(todo)}] {name} ({province}) -> {result}", file=stderr)
+    return done
+
+
+def propose(pairs, done):
+    """根据解析结果生成 data/school.txt 的修改建议。
+
+    返回值: 行列表；已有学校会给出追加别名后的整行，新学校给出新行。
+    """
+
+    aliases = {}
+    lines = []
+    for name, province in pairs:
+        kind, target, extra = done[(name, province)]
+        if kind == "c":
+            lines.append(f"{province},{target},{name}")
+            continue
+        new = aliases.setdefault(target, [])
+        for alias in [extra, name]:
+            if alias and alias != target.name and alias not in target.aliases and alias not in new:
+                new.append(alias)
+    for school, new in aliases.items():
+        if new:
+            lines.append(",".join([school.province, school.city, school.name] + school.aliases + new))
+    return lines
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="批量解析学校名称")
+    parser.add_argument("input", help="输入文件，每行格式为 <学校名称>,<省份>")
+    parser.add_argument("-j", "--journal", help="日志文件，默认为 <输入文件>.journal")
+    parser.add_argument("-o", "--output", help="修改建议的输出文件，默认输出到标准输出")
+    parser.add_argument("--schools", default="data/school.txt", help="学校列表文件")
+    args = parser.parse_args()
+
+    School.print_conflict_report(School.load(args.schools))
+    pairs = read_pairs(args.input)
+    done = resolve_all(pairs, args.journal or args.input + ".journal")
+    lines = propose(pairs, done)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write("".join(line + "\n" for line in lines))
+    else:
+        for line in lines:
+            print(line)
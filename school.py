@@ -1,6 +1,8 @@
 #!/usr/bin/env python3
 # -*- coding: UTF-8 -*-
 
+from normalizer import Normalizer, city_prefixes, normalize, province_prefixes
+from sys import stderr
 import api
 import math
 import util
@@ -11,6 +13,9 @@ class School:
     __school_name_map__ = {}
     __school_name_map_by_province__ = {}
     __schools_by_pc__ = {}
+    __school_keys__ = set()
+    __normalizer__ = None
+    __ranking__ = {}
 
     def __init__(self, idx, name, province, city, aliases):
         self.id = idx
@@ -21,41 +26,128 @@ class School:
         self.score = util.D(0)
 
     @staticmethod
-    def create(name, province, city, aliases):
+    def create(name, province, city, aliases, conflicts=None):
         """新建学校。
 
         name: 正式名称。
         province: 省份。
         city: 城市（或区）。
         aliases: 别名列表（可以为空）。
+        conflicts: 冲突报告，格式见 School.load；为 None 时直接输出警告。
         """
 
         idx = School.count_all()
         school = School(idx, name, province, city, aliases)
         School.__all_school_list__.append(school)
-        School.__school_name_map__[name] = school
-        for alias in aliases:
-            School.__school_name_map__[alias] = school
-        
+        report = School.__new_conflicts__() if conflicts is None else conflicts
+
+        # 全局名称映射，后定义者覆盖先定义者
+        name_map = School.__school_name_map__
+        for key in [name] + aliases:
+            if key != "" and key in name_map and name_map[key].province != province:
+                report["global"].append((idx, key, name_map[key].id))
+            name_map[key] = school
+
         # 按省份存储学校名称映射
-        if province not in School.__school_name_map_by_province__:
-            School.__school_name_map_by_province__[province] = {}
-        if name != "" and name in School.__school_name_map_by_province__[province]:
-            print(f"\x1b[01mschool.txt: \x1b[031mwarning: \x1b[0;37m学校 '{name}' 在省份 '{province}' 内重复定义\x1b[0m")
-        School.__school_name_map_by_province__[province][name] = school
+        province_map = School.__school_name_map_by_province__.setdefault(province, {})
+        if name != "" and name in province_map:
+            report["names"].append((idx, province, name, province_map[name].id))
+        province_map[name] = school
         for alias in aliases:
-            if alias != "" and alias in School.__school_name_map_by_province__[province]:
-                print(f"\x1b[01mschool.txt: \x1b[031mwarning: \x1b[0;37m学校别名 '{alias}' 在省份 '{province}' 内重复定义\x1b[0m")
-            School.__school_name_map_by_province__[province][alias] = school
-        
-        pc_key = (province, city)
-        if pc_key not in School.__schools_by_pc__:
-            School.__schools_by_pc__[pc_key] = []
-        if school in School.__schools_by_pc__[pc_key]:
-            print(f"\x1b[01mschool.txt: \x1b[031mwarning: \x1b[0;37m学校 '{name}' 在全局范围内重复定义\x1b[0m")
-        School.__schools_by_pc__[pc_key].append(school)
+            if alias != "" and alias in province_map and province_map[alias] is not school:
+                report["aliases"].append((idx, province, alias, province_map[alias].id))
+            province_map[alias] = school
+
+        pc_key = (province, city, name)
+        if name != "" and pc_key in School.__school_keys__:
+            report["schools"].append((idx, province, city, name))
+        School.__school_keys__.add(pc_key)
+        School.__schools_by_pc__.setdefault((province, city), []).append(school)
+
+        if conflicts is None:
+            School.print_conflicts(report)
         return school
 
+    @staticmethod
+    def __new_conflicts__():
+        return {"schools": [], "names": [], "aliases": [], "global": []}
+
+    @staticmethod
+    def load(filename="data/school.txt"):
+        """从文件加载所有学校，一次遍历建立全部映射。
+
+        filename: 学校列表文件，格式见 data/school.txt。
+
+        返回值: 冲突报告 dict，各项均为元组列表：
+            schools: (学校 ID, 省份, 城市, 名称)，同一城市内重复定义的学校；
+            names: (学校 ID, 省份, 名称, 先前学校 ID)，省份内重复的正式名称；
+            aliases: (学校 ID, 省份, 别名, 先前学校 ID)，省份内与其他学校冲突的别名；
+            global: (学校 ID, 名称, 先前学校 ID)，跨省份重名，全局映射以后者为准。
+        """
+
+        conflicts = School.__new_conflicts__()
+        with open(filename, encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if not line or line.startswith("#"):
+                    continue
+                parts = line.split(",")
+                if len(parts) < 3:
+                    continue
+                School.create(parts[2], parts[0], parts[1], parts[3:], conflicts)
+        return conflicts
+
+    @staticmethod
+    def print_conflicts(conflicts, file=stderr):
+        """输出冲突报告中的警告。
+
+        conflicts: 冲突报告，格式见 School.load。
+        """
+
+        for _, province, city, name in conflicts["schools"]:
+            print(
+                f"\x1b[01mschool.txt: \x1b[031mwarning: \x1b[0;37m学校 '{name}' 在 '{province},{city}' 内重复定义\x1b[0m",
+                file=file,
+            )
+        for _, province, name, _ in conflicts["names"]:
+            print(
+                f"\x1b[01mschool.txt: \x1b[031mwarning: \x1b[0;37m学校 '{name}' 在省份 '{province}' 内重复定义\x1b[0m",
+                file=file,
+            )
+        for _, province, alias, _ in conflicts["aliases"]:
+            print(
+                f"\x1b[01mschool.txt: \x1b[031mwarning: \x1b[0;37m学校别名 '{alias}' 在省份 '{province}' 内重复定义\x1b[0m",
+                file=file,
+            )
+
+    @staticmethod
+    def print_conflict_report(conflicts, file=stderr):
+        """输出冲突报告：逐条输出同城、省内重名与别名冲突的警告，最后输出各类冲突的数量。
+
+        conflicts: 冲突报告，格式见 School.load。
+        """
+
+        School.print_conflicts(conflicts, file)
+        counts = {key: len(value) for key, value in conflicts.items()}
+        if any(counts.values()):
+            print(
+                f"\x1b[01mschool.txt: \x1b[0;37m同城重复 {counts['schools']} 处，省内重名 {counts['names']} 处，"
+                f"别名冲突 {counts['aliases']} 处，跨省重名 {counts['global']} 处\x1b[0m",
+                file=file,
+            )
+
+    @staticmethod
+    def clear():
+        "清空数据。"
+
+        School.__all_school_list__ = []
+        School.__school_name_map__ = {}
+        School.__school_name_map_by_province__ = {}
+        School.__schools_by_pc__ = {}
+        School.__school_keys__ = set()
+        School.__normalizer__ = None
+        School.__ranking__ = {}
+
     @staticmethod
     def by_name(name):
         """根据名称返回学校。
@@ -100,6 +192,10 @@ class School:
             if name in School.__school_name_map__:
                 return School.__school_name_map__[name]
 
+        # 剥离省市前缀后在本地做最长匹配，尽量避免访问网络
+        if (school := School.normalizer().resolve(name, province)) is not None:
+            return school
+
         redirect = api.get_redirect(name)
         if redirect is not None and redirect in School.__school_name_map__:
             return "b", School.__school_name_map__[redirect]
@@ -128,6 +224,86 @@ class School:
                 return "b", school
         return "c", city
 
+    @staticmethod
+    def normalizer():
+        "获取由当前所有学校名称及别名建立的离线规范化器。"
+
+        if School.__normalizer__ is None or School.__normalizer__.size != School.count_all():
+            School.__normalizer__ = Normalizer(School.__all_school_list__)
+        return School.__normalizer__
+
+    @staticmethod
+    def guess_location(name, province):
+        """根据名称中的行政区前缀推测学校所在的 (省份, 城市)，作为本地地点查询提供者，在访问网络之前尝试。
+
+        name: 学校名称。
+        province: 省份。
+        """
+
+        name = normalize(name)
+        for prefix in province_prefixes(province):
+            if name.startswith(prefix):
+                name = name[len(prefix) :]
+                break
+        best = None
+        for p, city in School.__schools_by_pc__:
+            if p != province:
+                continue
+            for prefix in city_prefixes(city):
+                if name.startswith(prefix) and (best is None or len(prefix) > best[0]):
+                    best = len(prefix), city
+        return None if best is None else (province, best[1])
+
+    @staticmethod
+    def build_ranking(oiers):
+        """根据选手的比赛记录计算各学校的评分，并建立全国、各省份、各城市的排行索引。
+
+        oiers: 选手列表。
+
+        返回值: 排行索引，键见 School.ranking_key。
+        """
+
+        for school in School.__all_school_list__:
+            school.score = util.D(0)
+        for oier in oiers:
+            for record in oier.records:
+                if record.school is not None:
+                    record.school.score += record.contribution()
+        order = sorted(
+            (school for school in School.__all_school_list__ if school.score > 0),
+            key=lambda school: (-school.score, school.id),
+        )
+        ranking = {None: order}
+        for school in order:
+            ranking.setdefault(school.province, []).append(school)
+            ranking.setdefault((school.province, school.city), []).append(school)
+        School.__ranking__ = ranking
+        return ranking
+
+    @staticmethod
+    def ranking_key(province=None, city=None):
+        """获取排行索引中对应的键。
+
+        province: 省份，为 None 时表示全国。
+        city: 城市，仅在指定省份时有效。
+        """
+
+        if province is None:
+            return None
+        if city is None:
+            return province
+        return (province, city)
+
+    @staticmethod
+    def ranking(province=None, city=None):
+        """获取按评分降序排列的学校列表，需先调用 School.build_ranking。
+
+        province: 省份，为 None 时表示全国。
+        city: 城市，仅在指定省份时有效。
+        """
+
+        return School.__ranking__.get(School.ranking_key(province, city), [])
+
     @staticmethod
     def count_all():
         "获取当前学校总数。"
@@ -144,3 +320,6 @@ class School:
         "获取位置，格式为 province,city。"
 
         return self.province + "," + self.city
+
+
+api.register_location_provider(School.guess_location)
@@ -0,0 +1,38 @@
+#!/usr/bin/env python3
+# -*- coding: UTF-8 -*-
+
+"""
+模块导入耗时基准测试（基于 python -X importtime）
+用法: python test/bench_import.py [模块名 ...]
+"""
+
+import os
+import subprocess
+import sys
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+MODULES = ["util", "oier", "record", "app"]
+
+
+def import_time(module, rounds=5):
+    """在新进程中导入模块，返回多次测量中最快的累计耗时（微秒）"""
+    best = None
+    for _ in range(rounds):
+        result = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+            cwd=ROOT,
+            capture_output=True,
+            text=True,
+        )
+        for line in result.stderr.splitlines():
+            parts = line.split("|")
+            if len(parts) == 3 and parts[2].strip() == module:
+                cumulative = int(parts[1])
+                best = cumulative if best is None else min(best, cumulative)
+    return best
+
+
+if __name__ == "__main__":
+    for module in sys.argv[1:] or MODULES:
+        us = import_time(module)
+        print(f"{module:>8}: {us / 1000:.1f} ms" if us is not None else f"{module:>8}: 导入失败")
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+# -*- coding: UTF-8 -*-
+
+"""
+并发负载下轻量端点的尾延迟测试
+用法: python test/bench_load.py [--url http://localhost:8000] [--duration 10] [--heavy 4] [--light 4]
+需要先启动服务器 (python run.py)。若干线程持续请求重量级端点（/schools, /stats），
+同时另外若干线程请求 /query，报告 /query 的延迟分位数。
+"""
+
+import argparse
+import threading
+import time
+
+import requests
+
+
+def percentile(values, p):
+    """返回 values 的 p 分位数（values 已排序）"""
+    if not values:
+        return float("nan")
+    return values[min(len(values) - 1, int(len(values) * p))]
+
+
+def worker(url, method, path, body, deadline, latencies, errors):
+    """在 deadline 之前循环请求同一端点，记录每次请求的耗时"""
+    session = requests.Session()
+    while time.perf_counter() < deadline:
+        start = time.perf_counter()
+        try:
+            response = session.request(method, url + path, json=body, timeout=60)
+            if response.status_code != 200:
+                errors.append(response.status_code)
+                continue
+        except requests.exceptions.RequestException as e:
+            errors.append(type(e).__name__)
+            continue
+        latencies.append(time.perf_counter() - start)
+
+
+def run(url, duration, heavy, light):
+    deadline = time.perf_counter() + duration
+    heavy_endpoints = [("GET", "/schools", None), ("GET", "/stats", None)]
+    light_latencies, heavy_latencies, errors = [], [], []
+    threads = []
+    for i in range(heavy):
+        method, path, body = heavy_endpoints[i % len(heavy_endpoints)]
+        threads.append(
+            threading.Thread(target=worker, args=(url, method, path, body, deadline, heavy_latencies, errors))
+        )
+    for _ in range(light):
+        body = {"names": ["张宇", "李明"]}
+        threads.append(
+            threading.Thread(target=worker, args=(url, "POST", "/query", body, deadline, light_latencies, errors))
+        )
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    for name, latencies in [("/query", light_latencies), ("重量级端点", heavy_latencies)]:
+        latencies.sort()
+        print(
+            f"{name}: {len(latencies)} 次, "
+            f"p50 {percentile(latencies, 0.5) * 1000:.1f} ms, "
+            f"p99 {percentile(latencies, 0.99) * 1000:.1f} ms, "
+            f"max {percentile(latencies, 1.0) * 1000:.1f} ms"
+        )
+    if errors:
+        print(f"失败请求: {len(errors)} 次, 例如 {errors[:5]}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="并发负载测试")
+    parser.add_argument("--url", default="http://localhost:8000", help="服务器地址")
+    parser.add_argument("--duration", type=float, default=10, help="测试时长（秒）")
+    parser.add_argument("--heavy", type=int, default=4, help="请求重量级端点的并发数")
+    parser.add_argument("--light", type=int, default=4, help="请求 /query 的并发数")
+    args = parser.parse_args()
+    run(args.url, args.duration, args.heavy, args.light)
@@ -0,0 +1,43 @@
+#!/usr/bin/env python3
+# -*- coding: UTF-8 -*-
+
+"""
+内存数据库占用报告（基于 tracemalloc）
+用法: python test/bench_memory.py
+需要 dist/result.txt。
+"""
+
+import gc
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+os.chdir(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import app
+from oier import OIer
+
+
+def measure(step):
+    """执行 step 并返回 (新增内存字节数, 耗时秒数)"""
+    gc.collect()
+    before = tracemalloc.get_traced_memory()[0]
+    start = time.perf_counter()
+    step()
+    elapsed = time.perf_counter() - start
+    gc.collect()
+    return tracemalloc.get_traced_memory()[0] - before, elapsed
+
+
+if __name__ == "__main__":
+    tracemalloc.start()
+    measure(app.load_contests)
+    measure(app.load_schools)
+    size, elapsed = measure(app.load_oiers)
+    n_oiers = OIer.count_all()
+    n_records = sum(len(oier.records) for oier in OIer.get_all())
+    print(f"选手数: {n_oiers}, 记录数: {n_records}")
+    print(f"选手与记录占用: {size / 2**20:.2f} MiB, 平均每条记录 {size / max(n_records, 1):.0f} B")
+    print(f"加载耗时: {elapsed:.2f} s (含 tracemalloc 开销)")
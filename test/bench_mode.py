@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+# -*- coding: UTF-8 -*-
+
+"""
+众数计算（get_mode / get_weighted_mode）微基准测试
+用法: python test/bench_mode.py [记录组数]
+"""
+
+import os
+import random
+import sys
+import timeit
+from collections import Counter
+from itertools import chain
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import util
+
+
+def counter_mode(sets):
+    """基于 Counter 的参考实现"""
+    counter = Counter(chain(*sets))
+    most = counter.most_common(1)[0][1]
+    return sorted(k for k, v in counter.items() if v == most)
+
+
+def counter_weighted_mode(dicts):
+    """基于 Counter 的参考实现"""
+    counter = Counter()
+    for d in dicts:
+        counter.update(d)
+    most = counter.most_common(1)[0][1]
+    return sorted(k for k, v in counter.items() if v == most)
+
+
+def make_groups(n, seed=0):
+    """生成 n 个随机记录组，每个记录组由 1 ~ 6 条记录的入学年份字典组成"""
+    rng = random.Random(seed)
+    groups = []
+    for _ in range(n):
+        em = rng.randint(2000, 2024)
+        group = []
+        for _ in range(rng.randint(1, 6)):
+            width = rng.choice([1, 1, 1, 3, 16])
+            group.append({em + rng.randint(-1, 1) - i: rng.choice([1, 2]) for i in range(width)})
+        groups.append(group)
+    return groups
+
+
+def bench(name, func, number):
+    best = min(timeit.repeat(func, number=number, repeat=5))
+    print(f"{name:<36}{best / number * 1000:8.2f} ms")
+
+
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    groups = make_groups(n)
+    singles = [[group[0]] for group in groups]
+
+    for group in groups:
+        assert util.get_mode(group) == counter_mode(group)
+        assert util.get_weighted_mode(group) == counter_weighted_mode(group)
+
+    print(f"{n} 个记录组")
+    bench("Counter get_mode", lambda: [counter_mode(group) for group in groups], 3)
+    bench("get_mode", lambda: [util.get_mode(group) for group in groups], 3)
+    bench("Counter get_weighted_mode", lambda: [counter_weighted_mode(group) for group in groups], 3)
+    bench("get_weighted_mode", lambda: [util.get_weighted_mode(group) for group in groups], 3)
+    bench("Counter get_weighted_mode (单条)", lambda: [counter_weighted_mode(single) for single in singles], 3)
+    bench("get_weighted_mode (单条)", lambda: [util.get_weighted_mode(single) for single in singles], 3)
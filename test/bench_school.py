@@ -0,0 +1,34 @@
+#!/usr/bin/env python3
+# -*- coding: UTF-8 -*-
+
+"""
+学校列表加载基准测试
+用法: python test/bench_school.py [次数]
+"""
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+os.chdir(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from school import School
+
+
+def bench_load(rounds):
+    """多次加载 data/school.txt 并输出耗时"""
+    timings = []
+    for _ in range(rounds):
+        School.clear()
+        start = time.perf_counter()
+        conflicts = School.load("data/school.txt")
+        timings.append(time.perf_counter() - start)
+    timings.sort()
+    print(f"学校数: {School.count_all()}")
+    print("冲突: " + ", ".join(f"{key} {len(value)}" for key, value in conflicts.items()))
+    print(f"加载耗时: 最快 {timings[0] * 1000:.1f} ms, 中位数 {timings[len(timings) // 2] * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    bench_load(int(sys.argv[1]) if len(sys.argv) > 1 else 10)
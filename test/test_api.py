@@ -8,20 +8,24 @@ OIerDb API 测试脚本
 
 import requests
 import json
+import os
 import time
 
 BASE_URL = "http://localhost:8000"
 
-def test_api_endpoint(name, method, endpoint, data=None):
+# 管理接口的令牌，与服务器的 OIERDB_ADMIN_TOKEN 一致
+ADMIN_HEADERS = {"X-Admin-Token": os.environ.get("OIERDB_ADMIN_TOKEN", "")}
+
+def test_api_endpoint(name, method, endpoint, data=None, headers=None):
     """测试API端点"""
     print(f"\n🧪 测试 {name}")
     print(f"📍 {method} {endpoint}")
     
     try:
         if method == "GET":
-            response = requests.get(f"{BASE_URL}{endpoint}")
+            response = requests.get(f"{BASE_URL}{endpoint}", headers=headers)
         elif method == "POST":
-            response = requests.post(f"{BASE_URL}{endpoint}", json=data)
+            response = requests.post(f"{BASE_URL}{endpoint}", json=data, headers=headers)
         
         print(f"📊 状态码: {response.status_code}")
         
@@ -43,6 +47,12 @@ def test_api_endpoint(name, method, endpoint, data=None):
                         print(f"✅ 成功 - 返回数据: {json.dumps(result, ensure_ascii=False)[:200]}...")
                 else:
                     print(f"✅ 成功 - 返回: {str(result)[:200]}...")
+            elif 'application/x-ndjson' in content_type:
+                # NDJSON流式响应，每行一条记录
+                lines = response.text.splitlines()
+                print(f"✅ 成功 - 流式返回 {len(lines)} 条记录")
+                if len(lines) > 0:
+                    print(f"📝 第一条记录预览: {lines[0][:200]}...")
             elif 'text/html' in content_type or endpoint == '/':
                 # HTML响应（如主页）
                 print(f"✅ 成功 - 返回HTML页面 (大小: {len(response.text)} 字符)")
@@ -78,20 +88,59 @@ def run_all_tests():
     
     # 测试基础端点
     test_api_endpoint("主页", "GET", "/")
+
+    # 测试就绪检查
+    test_api_endpoint("就绪检查", "GET", "/health/ready")
+
+    # 测试热更新
+    test_api_endpoint("热更新数据", "POST", "/admin/reload?wait=true", headers=ADMIN_HEADERS)
+    test_api_endpoint("响应缓存统计", "GET", "/admin/cache", headers=ADMIN_HEADERS)
     
     # 测试统计信息
     test_api_endpoint("统计信息", "GET", "/stats")
+    test_api_endpoint("排行榜 (GET)", "GET", "/ranking?score_type=oierdb&limit=5")
     
     # 测试比赛信息
     test_api_endpoint("比赛信息", "GET", "/contests")
+    test_api_endpoint("比赛成绩", "GET", "/contests/0/results?limit=10")
     
     # 测试学校信息  
     test_api_endpoint("学校信息", "GET", "/schools")
+    test_api_endpoint("学校信息 (NDJSON)", "GET", "/schools?stream=true")
+    test_api_endpoint("学校选手", "GET", "/schools/0/oiers?year_min=2018&limit=10")
+
+    # 测试学校排行榜
+    test_api_endpoint("学校排行榜", "GET", "/schools/ranking?limit=10")
+    test_api_endpoint("省内学校排行榜", "GET", "/schools/ranking?province=湖南&limit=5")
+
+    # 测试输入补全
+    test_api_endpoint("输入补全", "GET", "/suggest?prefix=zh")
+    test_api_endpoint("选手输入补全", "GET", "/suggest?prefix=张&suggest_type=oier&limit=5")
     
     # 测试批量查询 (使用常见姓名)
     test_api_endpoint("批量查询选手", "POST", "/query", {
         "names": ["张三", "李四", "王五", "赵六"]
     })
+    test_api_endpoint("模糊查询选手", "POST", "/query", {
+        "names": ["张三", "李四", "王五", "赵六"],
+        "fuzzy": True
+    })
+    
+    # 测试组合条件查询
+    test_api_endpoint("组合条件查询", "POST", "/query/advanced", {
+        "province": "浙江",
+        "contest_type": "NOI",
+        "level": "金牌",
+        "limit": 5
+    })
+    
+    # 测试带分布统计的搜索
+    test_api_endpoint("按省份搜索 (含分布统计)", "POST", "/search", {
+        "query": "浙江",
+        "search_type": "province",
+        "limit": 5,
+        "facets": ["year", "contest_type", "level"]
+    })
     
     # 测试智能搜索 - 按姓名
     test_api_endpoint("按姓名搜索", "POST", "/search", {
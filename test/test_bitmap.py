@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+# -*- coding: UTF-8 -*-
+
+"""
+位图与位图索引的测试
+用法: python -m pytest test/test_bitmap.py
+"""
+
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from bitmap import Bitmap, BitmapIndex
+
+SIZE = 1000
+
+
+def random_sets(seed):
+    rnd = random.Random(seed)
+    # 稀疏、稠密及空集各若干
+    return [set(rnd.sample(range(SIZE), k)) for k in (0, 3, 20, 31, 40, 300, 900, SIZE)]
+
+
+def test_storage_choice():
+    assert not Bitmap.of(SIZE, range(0, SIZE, 50)).is_dense()
+    assert Bitmap.of(SIZE, range(0, SIZE, 2)).is_dense()
+
+
+def test_iteration_and_length():
+    for s in random_sets(0):
+        bitmap = Bitmap.of(SIZE, sorted(s))
+        assert list(bitmap) == sorted(s)
+        assert len(bitmap) == len(s)
+
+
+def test_and_or_match_sets():
+    sets = random_sets(1)
+    for a in sets:
+        for b in sets:
+            x, y = Bitmap.of(SIZE, sorted(a)), Bitmap.of(SIZE, sorted(b))
+            assert list(x & y) == sorted(a & b)
+            assert list(x | y) == sorted(a | b)
+
+
+def test_full_and_from_position():
+    assert list(Bitmap.full(10)) == list(range(10))
+    for s in random_sets(2):
+        bitmap = Bitmap.of(SIZE, sorted(s))
+        for start in (0, 1, 499, SIZE):
+            assert list(bitmap.from_position(start)) == sorted(p for p in s if p >= start)
+
+
+def test_index():
+    index = BitmapIndex(5)
+    for position, (province, year) in enumerate([("浙江", 2018), ("浙江", 2018), ("湖南", 2019), ("浙江", 2020), ("北京", 2018)]):
+        index.add("province", province, position)
+        index.add("province", province, position)  # 同一对象的重复取值只记录一次
+        index.add("year", year, position)
+    index.freeze()
+    assert list(index.get("province", "浙江")) == [0, 1, 3]
+    assert list(index.get("province", "上海")) == []
+    assert list(index.union("year", [2019, 2020, 2021])) == [2, 3]
+    assert sorted(index.values("year")) == [2018, 2019, 2020]
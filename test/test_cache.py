@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+# -*- coding: UTF-8 -*-
+
+"""
+响应缓存的测试
+用法: python -m pytest test/test_cache.py
+"""
+
+import asyncio
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import cache
+from cache import ResponseCache
+
+
+def constant(body, calls):
+    async def compute():
+        calls.append(body)
+        await asyncio.sleep(0)
+        return body, "application/json"
+
+    return compute
+
+
+def test_hit_after_miss():
+    async def run():
+        c, calls = ResponseCache(1 << 10, 0), []
+        assert await c.get_or_compute("a", constant(b"1", calls)) == (b"1", "application/json")
+        assert await c.get_or_compute("a", constant(b"2", calls)) == (b"1", "application/json")
+        return c, calls
+
+    c, calls = asyncio.run(run())
+    assert calls == [b"1"]
+    assert c.stats()["hits"] == 1 and c.stats()["misses"] == 1
+
+
+def test_evicts_least_recently_used_by_size():
+    async def run():
+        c, calls = ResponseCache(10, 0), []
+        await c.get_or_compute("a", constant(b"aaaa", calls))
+        await c.get_or_compute("b", constant(b"bbbb", calls))
+        await c.get_or_compute("a", constant(b"aaaa", calls))  # a 变为最近使用
+        await c.get_or_compute("c", constant(b"cccc", calls))  # 淘汰 b
+        await c.get_or_compute("a", constant(b"aaaa", calls))
+        await c.get_or_compute("b", constant(b"bbbb", calls))
+        return c, calls
+
+    c, calls = asyncio.run(run())
+    assert calls == [b"aaaa", b"bbbb", b"cccc", b"bbbb"]
+    assert c.size <= 10 and c.evictions == 2
+
+
+def test_oversized_value_not_cached():
+    async def run():
+        c, calls = ResponseCache(3, 0), []
+        await c.get_or_compute("a", constant(b"aaaa", calls))
+        await c.get_or_compute("a", constant(b"aaaa", calls))
+        return c, calls
+
+    c, calls = asyncio.run(run())
+    assert len(calls) == 2 and c.size == 0
+
+
+def test_ttl_expiry(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(cache.time, "monotonic", lambda: now[0])
+
+    async def run():
+        c, calls = ResponseCache(1 << 10, 5), []
+        await c.get_or_compute("a", constant(b"1", calls))
+        now[0] += 4
+        await c.get_or_compute("a", constant(b"1", calls))
+        now[0] += 2
+        await c.get_or_compute("a", constant(b"1", calls))
+        return calls
+
+    assert len(asyncio.run(run())) == 2
+
+
+def test_concurrent_requests_coalesced():
+    async def run():
+        c, calls = ResponseCache(0, 0), []
+        results = await asyncio.gather(*[c.get_or_compute("a", constant(b"1", calls)) for _ in range(10)])
+        return c, calls, results
+
+    c, calls, results = asyncio.run(run())
+    assert calls == [b"1"] and all(result == (b"1", "application/json") for result in results)
+    assert c.stats()["coalesced"] == 9
+
+
+def test_errors_shared_and_not_cached():
+    async def failing():
+        await asyncio.sleep(0)
+        raise ValueError("boom")
+
+    async def run():
+        c = ResponseCache(1 << 10, 0)
+        results = await asyncio.gather(*[c.get_or_compute("a", failing) for _ in range(3)], return_exceptions=True)
+        return c, results
+
+    c, results = asyncio.run(run())
+    assert all(isinstance(result, ValueError) for result in results)
+    assert c.stats()["entries"] == 0
+
+
+def test_clear_discards_inflight_result():
+    async def run():
+        c, calls = ResponseCache(1 << 10, 0), []
+
+        async def compute():
+            c.clear()  # 计算期间数据被重新加载
+            return await constant(b"old", calls)()
+
+        await c.get_or_compute("a", compute)
+        return await c.get_or_compute("a", constant(b"new", calls))
+
+    assert asyncio.run(run()) == (b"new", "application/json")
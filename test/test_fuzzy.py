@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+# -*- coding: UTF-8 -*-
+
+"""
+相近姓名索引的测试
+用法: python -m pytest test/test_fuzzy.py
+"""
+
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from fuzzy import FuzzyNameIndex
+
+
+def edit_distance(a, b):
+    "插入、删除、替换、相邻字符交换各计一次的编辑距离"
+    f = [[i + j if i * j == 0 else 0 for j in range(len(b) + 1)] for i in range(len(a) + 1)]
+    for i in range(1, len(a) + 1):
+        for j in range(1, len(b) + 1):
+            f[i][j] = min(f[i - 1][j] + 1, f[i][j - 1] + 1, f[i - 1][j - 1] + (a[i - 1] != b[j - 1]))
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                f[i][j] = min(f[i][j], f[i - 2][j - 2] + 1)
+    return f[len(a)][len(b)]
+
+
+def test_edits_and_initials():
+    index = FuzzyNameIndex()
+    for name, initials in [("张伟", "zw"), ("张炜明", "zwm"), ("李明", "lm"), ("王晓明", "wxm"), ("汪小敏", "wxm")]:
+        index.add(name, initials)
+    assert index.lookup("张炜", "zw") == {"张伟": (1, True), "张炜明": (1, False)}
+    assert index.lookup("明李", "ml") == {"李明": (1, False)}  # 相邻交换
+    assert index.lookup("王小明", "wxm") == {"王晓明": (1, True), "汪小敏": (2, True)}
+    assert index.lookup("张伟", "zw") == {}  # 不含自身
+    assert index.lookup("赵六", "zl") == {}
+
+
+def test_two_character_names_allow_one_substitution():
+    index = FuzzyNameIndex()
+    for name, initials in [("周伟", "zw"), ("张万", "zw"), ("周文华", "zwh")]:
+        index.add(name, initials)
+    # 两个字都替换时首字母相同的姓名都会匹配，只允许替换一个字
+    assert index.lookup("周文", "zw") == {"周伟": (1, True), "周文华": (1, False)}
+
+
+def test_matches_brute_force():
+    rnd = random.Random(0)
+    alphabet = "abcd"
+    names = {"".join(rnd.choice(alphabet) for _ in range(rnd.randint(1, 4))) for _ in range(300)}
+    # 首字母取姓名本身的大写，不同姓名的首字母互不相同，只检验编辑距离部分
+    initials = {name: name.upper() for name in names}
+    index = FuzzyNameIndex()
+    for name in names:
+        index.add(name, initials[name])
+    for _ in range(300):
+        query = "".join(rnd.choice(alphabet) for _ in range(rnd.randint(1, 5)))
+        expected = {name: (1, False) for name in names if name != query and edit_distance(query, name) <= 1}
+        assert index.lookup(query, query.upper()) == expected
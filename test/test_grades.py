@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+# -*- coding: UTF-8 -*-
+
+"""
+年级解析与初中入学年份计算的测试
+用法: python -m pytest test/test_grades.py
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+os.chdir(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import pytest
+import util
+from contest import Contest
+
+
+def make_contest(year, fall_semester):
+    return Contest(0, {"name": "T", "type": "NOIP提高", "year": year, "fall_semester": fall_semester, "full_score": 400})
+
+
+def parse_grades(grade_name):
+    """逐字符解析年级名称的参考实现"""
+    g_element = util.config().grades["element"]
+    ret, cur = util.config().grades["initial"], grade_name
+    while cur:
+        element = next(element for element in g_element if cur.startswith(element))
+        ret += g_element[element]
+        cur = cur[len(element) :]
+    return 1 << ret
+
+
+def reference_enrollment_middle(contest, grades):
+    """按位枚举年级列表的参考实现"""
+    year = contest.school_year()
+    ems, mask = {}, grades
+    while mask:
+        grade = (mask & -mask).bit_length() - 16
+        ems[year - grade + 1] = 1 if grades == 4290837504 and grade > 5 else 2
+        mask &= mask - 1
+    return ems
+
+
+def test_grade_names():
+    assert util.get_grades("初一") == 1 << 16
+    assert util.get_grades("七年级") == 1 << 16
+    assert util.get_grades("初三") == 1 << 18
+    assert util.get_grades("新高一") == 1 << 18
+    assert util.get_grades("高三") == 1 << 21
+    assert util.get_grades("小学六年级") == 1 << 15
+    assert util.get_grades("初中") == (1 << 16) | (1 << 17) | (1 << 18)
+    assert util.get_grades("小学/无") == 4290837504
+
+
+def test_grade_table_matches_parser():
+    special = util.config().grades["special"]
+    for grade_name, grades in util.config().grade_table.items():
+        assert grades == (special[grade_name] if grade_name in special else parse_grades(grade_name))
+
+
+def test_unknown_grade():
+    with pytest.raises(ValueError):
+        util.get_grades("大一")
+
+
+def test_enrollment_middle_single_grade():
+    fall = make_contest(2020, True)
+    spring = make_contest(2021, False)
+    assert dict(util.enrollment_middle(fall, util.get_grades("初一"))) == {2020: 2}
+    assert dict(util.enrollment_middle(spring, util.get_grades("初一"))) == {2020: 2}
+    assert dict(util.enrollment_middle(fall, util.get_grades("高一"))) == {2017: 2}
+
+
+def test_enrollment_middle_multiple_grades():
+    contest = make_contest(2020, True)
+    assert dict(util.enrollment_middle(contest, util.get_grades("初中"))) == {2020: 2, 2019: 2, 2018: 2}
+    ems = util.enrollment_middle(contest, util.get_grades("小学/无"))
+    assert ems[2021] == 2 and ems[2014] == 1 and 2015 not in ems
+
+
+def test_enrollment_middle_unknown_grade():
+    assert dict(util.enrollment_middle(make_contest(2020, True), 0)) == {}
+
+
+def test_enrollment_middle_matches_reference():
+    contests = [make_contest(year, fall) for year in (2005, 2019, 2024) for fall in (True, False)]
+    for grades in set(util.config().grade_table.values()):
+        for contest in contests:
+            assert dict(util.enrollment_middle(contest, grades)) == reference_enrollment_middle(contest, grades)
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+# -*- coding: UTF-8 -*-
+
+"""
+离线学校名称规范化器的测试
+用法: python -m pytest test/test_normalizer.py
+"""
+
+import os
+import random
+import sys
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+os.chdir(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from normalizer import Normalizer, city_prefixes, normalize, province_prefixes
+from school import School
+
+
+def make_school(province, city, name, *aliases):
+    return SimpleNamespace(province=province, city=city, name=name, aliases=list(aliases))
+
+
+YALI = make_school("湖南", "长沙市", "雅礼中学")
+CS1 = make_school("湖南", "长沙市", "长沙市第一中学", "第一中学")
+ZZ1 = make_school("湖南", "株洲市", "株洲市第一中学", "第一中学")
+XJ = make_school("新疆", "乌鲁木齐市", "乌鲁木齐市第一中学")
+SCHOOLS = [YALI, CS1, ZZ1, XJ]
+
+
+def test_prefixed_and_bare_names():
+    normalizer = Normalizer(SCHOOLS)
+    for name in ["雅礼中学", "湖南省长沙市雅礼中学", "长沙雅礼中学", "湖南长沙雅礼中学", "长沙市 雅礼中学", "雅礼中学/某编程机构"]:
+        assert normalizer.resolve(name, "湖南") is YALI
+        assert normalizer.resolve(name) is YALI
+    assert normalizer.resolve("新疆维吾尔自治区乌鲁木齐市第一中学", "新疆") is XJ
+
+
+def test_ambiguous_suffix():
+    normalizer = Normalizer(SCHOOLS)
+    # “第一中学”同时是两所学校的别名，只有前缀能区分时才解析
+    assert normalizer.resolve("第一中学", "湖南") is None
+    assert normalizer.resolve("湖南省第一中学", "湖南") is None
+    assert normalizer.resolve("株洲第一中学", "湖南") is ZZ1
+    assert normalizer.resolve("长沙市第一中学", "湖南") is CS1  # 正式名称是更长的匹配
+
+
+def test_misses():
+    normalizer = Normalizer(SCHOOLS)
+    assert normalizer.resolve("北京四中", "北京") is None
+    assert normalizer.resolve("某某雅礼中学", "湖南") is None  # 前缀不是行政区
+    assert normalizer.resolve("株洲雅礼中学", "湖南") is None  # 城市不符
+    assert normalizer.resolve("雅礼中学", "浙江") is None  # 省份不符
+    assert normalizer.resolve("", "湖南") is None
+
+
+def reference_entries(schools):
+    "参考实现所用的 (学校, 可作前缀的行政区写法, 规范化后的名称列表)"
+    entries = []
+    for school in schools:
+        regions = {
+            p + c for p in [""] + province_prefixes(school.province) for c in [""] + city_prefixes(school.city)
+        }
+        entries.append((school, regions, [key for key in map(normalize, [school.name] + school.aliases) if key]))
+    return entries
+
+
+def reference(entries, name, province):
+    "逐个学校检查全部名称的参考实现：取最长的匹配，唯一时返回该学校"
+    name = normalize(name)
+    best, candidates = 0, []
+    for school, regions, keys in entries:
+        if province is not None and school.province != province:
+            continue
+        length = max(
+            (len(key) for key in keys if name.endswith(key) and name[: len(name) - len(key)] in regions), default=0
+        )
+        if length > best:
+            best, candidates = length, [school]
+        elif length == best and length > 0:
+            candidates.append(school)
+    return candidates[0] if len(candidates) == 1 else None
+
+
+def test_matches_brute_force():
+    School.clear()
+    School.load("data/school.txt")
+    schools = School.get_all()
+    normalizer = Normalizer(schools)
+    entries = reference_entries(schools)
+    rnd = random.Random(0)
+    for _ in range(200):
+        school = rnd.choice(schools)
+        key = rnd.choice([school.name] + school.aliases)
+        prefix = rnd.choice([""] + province_prefixes(school.province)) + rnd.choice([""] + city_prefixes(school.city))
+        name = rnd.choice([prefix, "某地"]) + key
+        province = rnd.choice([school.province, None])
+        assert normalizer.resolve(name, province) is reference(entries, name, province)
+    School.clear()
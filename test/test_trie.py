@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+# -*- coding: UTF-8 -*-
+
+"""
+前缀补全字典树的测试
+用法: python -m pytest test/test_trie.py
+"""
+
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from trie import PrefixTrie
+
+
+def build(entries, k):
+    "entries 为按得分降序排列的 (对象, 键列表)"
+    trie = PrefixTrie(k)
+    for item, keys in entries:
+        for key in keys:
+            trie.insert(key, item)
+    return trie
+
+
+def brute_force(entries, prefix, limit):
+    return [item for item, keys in entries if any(key.startswith(prefix) for key in keys)][:limit]
+
+
+def test_top_k_in_insertion_order():
+    entries = [("a", ["zhang"]), ("b", ["zhao"]), ("c", ["zhou", "zz"]), ("d", ["li"])]
+    trie = build(entries, 2)
+    assert trie.complete("z") == ["a", "b"]
+    assert trie.complete("zh", 1) == ["a"]
+    assert trie.complete("zho") == ["c"]
+    assert trie.complete("zz") == ["c"]
+    assert trie.complete("w") == []
+    assert trie.complete("") == []
+
+
+def test_same_item_counted_once():
+    # 名称与别名有公共前缀时，同一对象只占一个名额
+    trie = build([("a", ["长沙市一中", "长沙一中"]), ("b", ["长沙市雅礼中学"])], 2)
+    assert trie.complete("长沙") == ["a", "b"]
+    assert trie.complete("长沙一") == ["a"]
+
+
+def test_matches_brute_force():
+    rnd = random.Random(0)
+    alphabet = "abc"
+    entries = []
+    for i in range(500):
+        keys = ["".join(rnd.choice(alphabet) for _ in range(rnd.randint(1, 6))) for _ in range(rnd.randint(1, 2))]
+        entries.append((i, keys))
+    for k in (1, 3, 10):
+        trie = build(entries, k)
+        for length in range(1, 8):
+            for _ in range(30):
+                prefix = "".join(rnd.choice(alphabet) for _ in range(length))
+                for limit in (None, 1):
+                    assert trie.complete(prefix, limit) == brute_force(entries, prefix, limit or k)
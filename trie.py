@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+# -*- coding: UTF-8 -*-
+
+
+class PrefixTrie:
+    """前缀补全用的字典树。
+
+    每个节点保存键以该节点对应前缀开头的、得分最高的至多 k 个对象。对象须按得分从高到低依次插入，
+    这样每个节点最先到达的 k 个对象即为其前 k 名，查询时只需沿前缀走到对应节点，与对象总数无关。
+
+    为节省内存，节点起初是一个桶，直接保存子树中全部的 (键, 对象)；桶中的对象超过 k 个时才分裂出子节点。
+    前缀止于桶内时，逐个检查桶中的键，桶中至多有 k 个对象。
+    """
+
+    def __init__(self, k):
+        """新建字典树。
+
+        k: 每个节点保存的对象数上限，即单次补全最多返回的结果数。
+        """
+
+        self.k = k
+        # 节点为 [子节点字典（桶为 None）, 前 k 个对象, 桶中的 (键, 对象) 列表（已分裂为 None）]
+        self.__root__ = [None, [], []]
+
+    def __place__(self, node, depth, key, item):
+        while node[0] is not None:
+            if depth == len(key):
+                return  # 键止于已分裂的节点，该节点的前 k 个对象已确定，之后插入的得分都更低
+            child = node[0].get(key[depth])
+            if child is None:
+                child = node[0][key[depth]] = [None, [], []]
+            node = child
+            depth += 1
+
+        items, pairs = node[1], node[2]
+        pairs.append((key, item))
+        # 同一对象的各个键连续插入，重复时必然是列表中的最后一个
+        if not items or items[-1] is not item:
+            items.append(item)
+        if len(items) > self.k:
+            node[0], node[2] = {}, None
+            del items[self.k :]
+            for key, item in pairs:
+                self.__place__(node, depth, key, item)
+
+    def insert(self, key, item):
+        """以 key 为键插入对象 item。
+
+        同一对象可以用多个键插入，但须连续进行，各节点中同一对象只保存一次。空键不会被任何前缀补全，直接忽略。
+        """
+
+        if key:
+            self.__place__(self.__root__, 0, key, item)
+
+    def complete(self, prefix, limit=None):
+        """获取键以 prefix 开头的对象，按插入顺序（即得分从高到低）排列。
+
+        prefix: 前缀，为空时返回空列表。
+        limit: 返回数量上限，不超过 k，为 None 时取 k。
+        """
+
+        if not prefix:
+            return []
+        node, depth = self.__root__, 0
+        while depth < len(prefix) and node[0] is not None:
+            node = node[0].get(prefix[depth])
+            if node is None:
+                return []
+            depth += 1
+        if depth == len(prefix):
+            return node[1][:limit]
+
+        ret = []
+        for key, item in node[2]:
+            if key.startswith(prefix) and (not ret or ret[-1] is not item):
+                ret.append(item)
+        return ret[:limit]
@@ -1,12 +1,11 @@
 #!/usr/bin/env python3
 # -*- coding: UTF-8 -*-
 
-from collections import Counter
 from decimal import Decimal as D, getcontext
-from itertools import chain
-from sys import stderr
+from functools import cached_property, lru_cache
+from sys import intern, stderr
+from types import MappingProxyType
 import json
-import pypinyin
 
 getcontext().prec = 64
 
@@ -63,130 +62,176 @@ award_levels = [
 ]
 
 
-def __main__():
-    import json
-    import pypinyin
-    from contest import Contest
 
-    global add_contestant, contests, contest_type_coefficient, decay_coefficient, enrollment_middle, get_contest_id, get_grades, get_initials, get_mode, get_weighted_mode, lcs, rank_coefficient
+class StringTable:
+    """字符串驻留表，为每个不同的字符串分配一个小整数编号，相同的字符串在内存中只保存一份。
 
-    with open("static/contests.json", encoding='utf-8') as f:
-        for contest in json.load(f):
-            Contest.create(contest)
+    初始列表中的字符串依次编号为 0, 1, ...，与压缩格式中的编号一致；之后遇到的新字符串依次追加。
+    """
 
-    with open("static/grades.json", encoding='utf-8') as f:
-        g_ = json.load(f)
-    g_initial = g_["initial"]
-    g_element = g_["element"]
-    g_special = g_["special"]
+    def __init__(self, values=()):
+        self.values = []
+        self.codes = {}
+        for value in values:
+            self.code(value)
+        self.n_standard = len(self.values)
 
-    with open("static/surnames.json", encoding='utf-8') as f:
-        surnames = json.load(f)
+    def code(self, value):
+        "获取字符串的编号，未出现过的字符串会被追加到表中。"
 
-    with open("static/scoring.json", encoding='utf-8') as f:
-        scoring = json.load(f)
+        code = self.codes.get(value)
+        if code is None:
+            code = self.codes[value] = len(self.values)
+            self.values.append(intern(value))
+        return code
 
-    with open("static/name_exceptions.json", encoding='utf-8') as f:
-        name_exceptions = json.load(f)
+    def is_standard(self, code):
+        "判断编号是否属于初始列表（即可以直接写入压缩格式）。"
 
-    pypinyin.load_single_dict({ ord(k): v for k, v in name_exceptions.items() })
+        return code < self.n_standard
 
-    rc_list_legacy = (
-        [D(i) for i in range(100, 39, -1)]
-        + [D("0.15") * i for i in range(240, 50, -1)]
-        + [D("0.03") * i for i in range(250, 50, -1)]
-    )
+    def __getitem__(self, code):
+        return self.values[code]
 
-    rc_list = (
-        [D(i) for i in range(100, 39, -1)]
-        + [D("0.15") * i for i in range(239, 50, -1)]
-        + [D("0.05") * i for i in range(150, -1, -1)]
-    )
-    assert len(rc_list) == 401
-    assert sorted(rc_list, reverse=True) == rc_list
+    def __len__(self):
+        return len(self.values)
 
-    def get_initials(name):
-        """获取拼音首字母。
 
-        name: 姓名。
-        """
-        return "".join(get_initial_list(name))
+province_table = StringTable(provinces)
+award_level_table = StringTable(award_levels)
 
-    def get_initial_list(name):
-        initial = pypinyin.lazy_pinyin(name, style=pypinyin.Style.FIRST_LETTER)
-        for i in range(len(name), 0, -1):
-            if name[:i] in surnames:
-                initial[:i] = surnames[name[:i]]
-        return initial
 
-    def get_grades(grade_name):
-        """获取可能的年级列表。
+class Config:
+    """静态配置。各表均在首次访问时从 static/ 目录加载并缓存，导入本模块不读取任何文件。"""
 
-        grade_name: 年级名称。
+    def __init__(self, root="static"):
+        self.root = root
 
-        返回值: 以初一为 16，(2^可能年级) 列表之和，需要保证年级在 0 ~ 31 之间。
-        """
+    def __load__(self, name, default):
+        try:
+            with open(f"{self.root}/{name}.json", encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return default
 
-        if grade_name in g_special:
-            return g_special[grade_name]
-        ret, cur = g_initial, grade_name
-        while True:
-            if cur == "":
-                ret = 1 << ret
-                g_special.setdefault(grade_name, ret)
-                return ret
-            for element in g_element:
-                if cur.startswith(element):
-                    ret += g_element[element]
-                    cur = cur[len(element) :]
-                    break
-            else:
-                raise ValueError(f"未知的年级：\x1b[032m'{grade_name}'\x1b[0m")
-
-    def enrollment_middle(contest, grades):
-        """获取初中入学年份列表。
-
-        contest: 比赛对象。
-        grades: 所有可能的年级列表。
-
-        返回值: dict，表示所有可能的入学年份列表，值表示优先级。
-        """
+    @cached_property
+    def contests(self):
+        "比赛列表，格式见 static/contests.json。"
+
+        return self.__load__("contests", [])
 
-        year = contest.school_year()
-        mask = grades
-        is_primary_or_none = grades == 4290837504  # "小学/无" 中小学优先级比大学高
-        ems = {}
-        while mask:
-            grade = (mask & -mask).bit_length() - 16
-            ems[year - grade + 1] = 1 if is_primary_or_none and grade > 5 else 2
-            mask &= mask - 1
-        return ems
+    @cached_property
+    def grades(self):
+        "年级名称规则，格式见 static/grades.json。"
 
-    def get_mode(sets):
-        """获取最佳初中入学年份。
+        return self.__load__("grades", {"initial": 0, "element": {}, "special": {}})
 
-        sets: 集合的列表，每个集合表示可能的入学年份集合。
+    @cached_property
+    def grade_table(self):
+        """年级名称到年级列表的映射，预先包含所有特殊名称及由至多三个基本元素组成的名称。
 
-        返回值: 最佳入学年份的列表。
+        未出现在表中的名称由 get_grades 解析后加入。
         """
 
-        counter = Counter(chain(*sets))
-        most = counter.most_common(1)[0][1]
-        return sorted(k for k, v in counter.items() if v == most)
+        g_initial, g_element = self.grades["initial"], self.grades["element"]
+        level, table = [("", g_initial)], {}
+        for _ in range(3):
+            level = [(name + element, value + g_element[element]) for name, value in level for element in g_element]
+            table.update((name, 1 << value) for name, value in level if 0 <= value <= 31)
+        table.update(self.grades["special"])
+        return table
 
-    def get_weighted_mode(dicts):
-        """获取最佳初中入学年份。
+    @cached_property
+    def surnames(self):
+        "多音字姓氏的首字母表。"
 
-        dicts: 字典的列表，每个字典表示可能的入学年份字典以及相应的优先级。
+        return self.__load__("surnames", {})
 
-        返回值: 最佳入学年份的列表。
-        """
+    @cached_property
+    def surname_trie(self):
+        "多音字姓氏的前缀树，终止结点以 None 为键存储首字母。"
+
+        root = {}
+        for surname, initial in self.surnames.items():
+            node = root
+            for char in surname:
+                node = node.setdefault(char, {})
+            node[None] = initial
+        return root
+
+    @cached_property
+    def scoring(self):
+        "各比赛类型的系数表。"
+
+        return self.__load__("scoring", {})
+
+    @cached_property
+    def name_exceptions(self):
+        "姓名中多音字的读音表。"
+
+        return self.__load__("name_exceptions", {})
+
+    @cached_property
+    def pinyin(self):
+        "已加载姓名读音表的 pypinyin 模块。"
+
+        import pypinyin
+
+        pypinyin.load_single_dict({ord(k): v for k, v in self.name_exceptions.items()})
+        return pypinyin
+
+    @cached_property
+    def rc_list(self):
+        "排名系数表，下标为 400 * 排名 // 总人数。"
+
+        rc_list = (
+            [D(i) for i in range(100, 39, -1)]
+            + [D("0.15") * i for i in range(239, 50, -1)]
+            + [D("0.05") * i for i in range(150, -1, -1)]
+        )
+        assert len(rc_list) == 401
+        assert sorted(rc_list, reverse=True) == rc_list
+        return rc_list
+
+
+__config__ = None
+
+
+def config():
+    "获取全局唯一的静态配置对象。"
+
+    global __config__
+    if __config__ is None:
+        __config__ = Config()
+    return __config__
+
+
+"兼容旧接口：以模块属性的形式按需访问配置中的各表。"
+__config_attributes__ = {
+    "contests_data": lambda: config().contests,
+    "g_initial": lambda: config().grades["initial"],
+    "g_element": lambda: config().grades["element"],
+    "g_special": lambda: config().grades["special"],
+    "surnames": lambda: config().surnames,
+    "scoring": lambda: config().scoring,
+    "name_exceptions": lambda: config().name_exceptions,
+    "rc_list": lambda: config().rc_list,
+}
 
-        counter = Counter()
-        for d in dicts:
-            counter.update(d)
-        most = counter.most_common(1)[0][1]
-        return sorted(k for k, v in counter.items() if v == most)
+
+def __getattr__(name):
+    if name in __config_attributes__:
+        return __config_attributes__[name]()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __main__():
+    from contest import Contest
+
+    global contest_type_coefficient, decay_coefficient, lcs, rank_coefficient
+
+    for contest in config().contests:
+        Contest.create(contest)
 
     def decay_coefficient(year):
         """获取因年份造成的衰变系数，<b>该函数可以自行修改</b>。
@@ -213,7 +258,7 @@ def __main__():
                 f"\x1b[01;33mwarning: \x1b[0m诡异的排名：\x1b[32m{rank}\x1b[0m / \x1b[32m{total}\x1b[0m (from \x1b[32m{name}\x1b[0m)，已自动 clamped",
                 file=stderr,
             )
-        return rc_list[400 * max(min(rank, total), 1) // total]
+        return config().rc_list[400 * max(min(rank, total), 1) // total]
 
     def contest_type_coefficient(type, name=None):
         """获取不同比赛类型产生的系数，<b>该函数可以自行修改</b>。
@@ -224,9 +269,10 @@ def __main__():
         返回值: 系数，<b>需为 Decimal 类型</b>。
         """
 
+        scoring = config().scoring
         if type not in scoring:
             print(
-                "\x1b[01;33mwarning: \x1b[0m未知的比赛类型：\x1b[32m'{type}'\x1b[0m (from \x1b[32m{name}\x1b[0m)，不计算贡献",
+                f"\x1b[01;33mwarning: \x1b[0m未知的比赛类型：\x1b[32m'{type}'\x1b[0m (from \x1b[32m{name}\x1b[0m)，不计算贡献",
                 file=stderr,
             )
         return D(scoring.get(type, "0"))
@@ -243,49 +289,21 @@ def __main__():
         return f[n][m]
 
 
-# 在模块级别定义必要的函数和变量
-import json
-import pypinyin
-
-# 加载数据
-try:
-    with open("static/contests.json", encoding='utf-8') as f:
-        contests_data = json.load(f)
-    
-    with open("static/grades.json", encoding='utf-8') as f:
-        g_ = json.load(f)
-    g_initial = g_["initial"]
-    g_element = g_["element"]
-    g_special = g_["special"]
-
-    with open("static/surnames.json", encoding='utf-8') as f:
-        surnames = json.load(f)
-
-    with open("static/scoring.json", encoding='utf-8') as f:
-        scoring = json.load(f)
-
-    with open("static/name_exceptions.json", encoding='utf-8') as f:
-        name_exceptions = json.load(f)
-
-    pypinyin.load_single_dict({ ord(k): v for k, v in name_exceptions.items() })
-
-    rc_list = (
-        [D(i) for i in range(100, 39, -1)]
-        + [D("0.15") * i for i in range(239, 50, -1)]
-        + [D("0.05") * i for i in range(150, -1, -1)]
-    )
-    assert len(rc_list) == 401
-
-except FileNotFoundError:
-    # 如果文件不存在，定义空的默认值
-    contests_data = []
-    g_initial = 0
-    g_element = {}
-    g_special = {}
-    surnames = {}
-    scoring = {}
-    name_exceptions = {}
-    rc_list = [D(0)] * 401
+@lru_cache(maxsize=1 << 18)
+def __initial_tuple__(name):
+    pypinyin = config().pinyin
+    initial = pypinyin.lazy_pinyin(name, style=pypinyin.Style.FIRST_LETTER)
+    # 沿姓氏前缀树匹配姓名的所有前缀，较短的匹配覆盖较长的匹配
+    node, matches = config().surname_trie, []
+    for char in name:
+        node = node.get(char)
+        if node is None:
+            break
+        if None in node:
+            matches.append(node[None])
+    for value in reversed(matches):
+        initial[: len(value)] = value
+    return tuple(initial)
 
 
 def get_initials(name):
@@ -293,15 +311,11 @@ def get_initials(name):
 
     name: 姓名。
     """
-    return "".join(get_initial_list(name))
+    return "".join(__initial_tuple__(name))
 
 
 def get_initial_list(name):
-    initial = pypinyin.lazy_pinyin(name, style=pypinyin.Style.FIRST_LETTER)
-    for i in range(len(name), 0, -1):
-        if name[:i] in surnames:
-            initial[:i] = surnames[name[:i]]
-    return initial
+    return list(__initial_tuple__(name))
 
 
 def get_grades(grade_name):
@@ -312,14 +326,12 @@ def get_grades(grade_name):
     返回值: 以初一为 16，(2^可能年级) 列表之和，需要保证年级在 0 ~ 31 之间。
     """
 
-    if grade_name in g_special:
-        return g_special[grade_name]
-    ret, cur = g_initial, grade_name
-    while True:
-        if cur == "":
-            ret = 1 << ret
-            g_special.setdefault(grade_name, ret)
-            return ret
+    table = config().grade_table
+    if grade_name in table:
+        return table[grade_name]
+    g_element = config().grades["element"]
+    ret, cur = config().grades["initial"], grade_name
+    while cur != "":
         for element in g_element:
             if cur.startswith(element):
                 ret += g_element[element]
@@ -327,56 +339,99 @@ def get_grades(grade_name):
                 break
         else:
             raise ValueError(f"未知的年级：\x1b[032m'{grade_name}'\x1b[0m")
+    table[grade_name] = 1 << ret
+    return table[grade_name]
+
+
+__enrollment_table__ = {}
 
 
 def enrollment_middle(contest, grades):
     """获取初中入学年份列表。
 
     contest: 比赛对象。
-    grades: 所有可能的年级列表。
+    grades: 所有可能的年级列表，格式同 get_grades 的返回值；0 表示未知。
 
-    返回值: dict，表示所有可能的入学年份列表，值表示优先级。
+    返回值: dict，表示所有可能的入学年份列表，值表示优先级。相同学年、相同年级列表的结果共享同一只读对象。
     """
-    ret = {}
-    for grade in grades:
-        if grade & (1 << 16):  # 初一
-            ret[contest.year - (grade >> 4) + 1] = 1
-        elif grade & (1 << 17):  # 初二
-            ret[contest.year - (grade >> 4) + 2] = 1
-        elif grade & (1 << 18):  # 初三
-            ret[contest.year - (grade >> 4) + 3] = 1
-        elif grade & (1 << 19):  # 高一
-            ret[contest.year - (grade >> 4) + 4] = 1
-        elif grade & (1 << 20):  # 高二
-            ret[contest.year - (grade >> 4) + 5] = 1
-        elif grade & (1 << 21):  # 高三
-            ret[contest.year - (grade >> 4) + 6] = 1
-    return ret
-
-
-def get_weighted_mode(d):
-    """获取加权众数。
-
-    d: dict，键为值，值为权重。
-
-    返回值: (众数, 权重)。
+
+    key = (contest.school_year(), grades)
+    if (ems := __enrollment_table__.get(key)) is None:
+        ems = __enrollment_table__[key] = MappingProxyType(
+            {key[0] + offset: priority for offset, priority in __enrollment_offsets__(grades)}
+        )
+    return ems
+
+
+@lru_cache(maxsize=None)
+def __enrollment_offsets__(grades):
+    # 年级列表 -> ((入学年份相对学年的偏移, 优先级), ...)
+    is_primary_or_none = grades == 4290837504  # "小学/无" 中小学优先级比大学高
+    ret, mask = [], grades
+    while mask:
+        grade = (mask & -mask).bit_length() - 16
+        ret.append((1 - grade, 1 if is_primary_or_none and grade > 5 else 2))
+        mask &= mask - 1
+    return tuple(ret)
+
+
+def __year_range__(groups):
+    lo = hi = None
+    for group in groups:
+        if group:
+            a, b = min(group), max(group)
+            if lo is None or a < lo:
+                lo = a
+            if hi is None or b > hi:
+                hi = b
+    return lo, hi
+
+
+def __modes__(hist, lo):
+    most = max(hist)
+    return [lo + i for i, count in enumerate(hist) if count == most] if most else []
+
+
+def get_mode(sets):
+    """获取最佳初中入学年份。
+
+    sets: 集合的列表，每个集合表示可能的入学年份集合。
+
+    返回值: 最佳入学年份的列表（升序）。
     """
-    if not d:
-        return None, 0
-    max_weight = max(d.values())
-    for k, v in d.items():
-        if v == max_weight:
-            return k, v
+
+    lo, hi = __year_range__(sets)
+    if lo is None:
+        return []
+    hist = [0] * (hi - lo + 1)
+    for s in sets:
+        for year in s:
+            hist[year - lo] += 1
+    return __modes__(hist, lo)
 
 
-def get_mode(l):
-    """获取众数。
+def get_weighted_mode(dicts):
+    """获取最佳初中入学年份。
 
-    l: list。
+    dicts: 字典的列表，每个字典表示可能的入学年份字典以及相应的优先级。
 
-    返回值: 众数。
+    返回值: 最佳入学年份的列表（升序）。
     """
-    return get_weighted_mode({i: l.count(i) for i in set(l)})[0]
+
+    if len(dicts) == 1:
+        d = dicts[0]
+        if not d:
+            return []
+        most = max(d.values())
+        return sorted(year for year, weight in d.items() if weight == most)
+    lo, hi = __year_range__(dicts)
+    if lo is None:
+        return []
+    hist = [0] * (hi - lo + 1)
+    for d in dicts:
+        for year, weight in d.items():
+            hist[year - lo] += weight
+    return __modes__(hist, lo)
 
 
 def decay_coefficient(year):
@@ -405,7 +460,7 @@ def rank_coefficient(rank, total, name=None):
             f"\x1b[01;33mwarning: \x1b[0m诡异的排名：\x1b[32m{rank}\x1b[0m / \x1b[32m{total}\x1b[0m (from \x1b[32m{name}\x1b[0m)，已自动 clamped",
             file=stderr,
         )
-    return rc_list[400 * max(min(rank, total), 1) // total]
+    return config().rc_list[400 * max(min(rank, total), 1) // total]
 
 
 def contest_type_coefficient(type, name=None):
@@ -417,9 +472,10 @@ def contest_type_coefficient(type, name=None):
     返回值: 系数，<b>需为 Decimal 类型</b>。
     """
 
+    scoring = config().scoring
     if type not in scoring:
         print(
-            "\x1b[01;33mwarning: \x1b[0m未知的比赛类型：\x1b[32m'{type}'\x1b[0m (from \x1b[32m{name}\x1b[0m)，不计算贡献",
+            f"\x1b[01;33mwarning: \x1b[0m未知的比赛类型：\x1b[32m'{type}'\x1b[0m (from \x1b[32m{name}\x1b[0m)，不计算贡献",
             file=stderr,
         )
     return D(scoring.get(type, "0"))